@@ -0,0 +1,298 @@
+"""
+Resumable, budgeted searches for per-frame planning.
+
+Each search object keeps its frontier between calls: run() expands at most
+a node budget and/or a microsecond budget, then returns, and the next call
+carries on where it stopped. ``path`` stays None until a first solution is
+known, so a ghost can keep following its previous path meanwhile.
+
+AnytimeAStar is ARA* (Likhachev, Gordon & Thrun): it starts with an
+inflated heuristic weight, publishes the first (bounded-suboptimal) path
+as soon as it reaches the goal, then lowers the weight and repairs the
+search from the states whose cost improved, until weight 1 proves the
+path optimal.
+
+Per-cell state (parents, depths, g-values, closed marks) lives in dicts
+keyed by cell id, so starting a search costs O(1) whatever the board
+size and only the cells it touches are stored; several searches (one per
+ghost) can be in progress at once.
+"""
+import collections
+import heapq
+import time
+
+from maze import DIRECTIONS, SEARCH_ORDER
+
+INF = float('inf')
+
+# Khi có time budget, kiểm tra đồng hồ sau mỗi lô nút này
+CLOCK_CHECK_NODES = 64
+
+
+def search_moves(maze):
+    """(bit trong open_dirs, bước id ô) cho từng hướng theo SEARCH_ORDER."""
+    return [(1 << DIRECTIONS.index((dx, dy)), dy * maze.width + dx) for dx, dy in SEARCH_ORDER]
+
+
+def path_less(maze, parent, a, b):
+    """
+    Whether the path to a sorts before the path to b, comparing (x, y)
+    cells from the start like the original path lists did. Both paths
+    must have the same length.
+    """
+    # Đi ngược song song tới chỗ hai đường nhập lại; cặp ô khác nhau cuối cùng (gần start nhất) quyết định
+    last_a, last_b = a, b
+    while a != b:
+        last_a, last_b = a, b
+        a, b = parent[a], parent[b]
+    width = maze.width
+    return (last_a % width, last_a // width) < (last_b % width, last_b // width)
+
+
+class BudgetedSearch:
+    def __init__(self, maze, start_pos, target_pos):
+        self.maze = maze
+        self.start_pos = start_pos
+        self.target_pos = target_pos
+        self.start = maze.cell_id(*start_pos)
+        self.goal = maze.cell_id(*target_pos)
+        self.parent = {self.start: self.start}  # id ô -> ô cha, chỉ các ô đã chạm tới
+        self.nodes = 0        # Tổng số nút đã mở rộng qua mọi lần run()
+        self.done = False
+        self.path = None      # Đường tốt nhất hiện có; None khi chưa có lời giải
+
+    def run(self, node_budget=None, time_budget_us=None):
+        """
+        Expand nodes until the search is done or a budget runs out.
+
+        Args:
+            node_budget (int, optional): Maximum nodes expanded by this call.
+            time_budget_us (float, optional): Wall-time budget in microseconds,
+                checked every CLOCK_CHECK_NODES nodes.
+
+        Returns:
+            int: Nodes expanded by this call.
+        """
+        remaining = INF if node_budget is None else node_budget
+        deadline = None
+        if time_budget_us is not None:
+            deadline = time.perf_counter_ns() + int(time_budget_us * 1000)
+        expanded = 0
+        while not self.done and remaining > 0:
+            limit = remaining if deadline is None else min(remaining, CLOCK_CHECK_NODES)
+            n = self._run(limit)
+            expanded += n
+            remaining -= n
+            if deadline is not None and time.perf_counter_ns() >= deadline:
+                break
+        self.nodes += expanded
+        return expanded
+
+    def _run(self, limit):
+        """Mở rộng tối đa limit nút; trả về số nút đã mở rộng."""
+        raise NotImplementedError
+
+    def _finish(self, found):
+        self.done = True
+        self.path = self._reconstruct(self.goal) if found else []
+
+    def _reconstruct(self, goal):
+        maze, parent, start = self.maze, self.parent, self.start
+        path = []
+        node = goal
+        while node != start:
+            path.append(maze.cell_pos(node))
+            node = parent[node]
+        path.reverse()
+        return path
+
+
+class BudgetedBFS(BudgetedSearch):
+    def __init__(self, maze, start_pos, target_pos):
+        super().__init__(maze, start_pos, target_pos)
+        self.queue = collections.deque([self.start])
+        self.moves = search_moves(maze)  # Cùng thứ tự láng giềng với Ghost.bfs
+
+    def _run(self, limit):
+        queue, parent, goal = self.queue, self.parent, self.goal
+        open_dirs, moves = self.maze.open_dirs, self.moves
+        expanded = 0
+        while queue and expanded < limit:
+            current = queue.popleft()
+            expanded += 1
+            if current == goal:
+                self._finish(True)
+                return expanded
+            dirs = open_dirs[current]
+            for bit, step in moves:
+                if not dirs & bit:
+                    continue
+                neighbor = current + step
+                if neighbor not in parent:
+                    parent[neighbor] = current
+                    queue.append(neighbor)
+        if not queue:
+            self._finish(False)
+        return expanded
+
+
+class BudgetedDFS(BudgetedSearch):
+    def __init__(self, maze, start_pos, target_pos, max_path_length=None):
+        """max_path_length: độ dài đường tối đa (tính cả ô xuất phát), None là không giới hạn."""
+        super().__init__(maze, start_pos, target_pos)
+        self.max_path_length = max_path_length if max_path_length is not None else INF
+        self.stack = [self.start]
+        self.depth = {self.start: 1}
+        self.moves = search_moves(maze)  # Cùng thứ tự láng giềng với Ghost.dfs
+
+    def _run(self, limit):
+        stack, parent, depth, goal = self.stack, self.parent, self.depth, self.goal
+        max_path_length = self.max_path_length
+        open_dirs, moves = self.maze.open_dirs, self.moves
+        expanded = 0
+        while stack and expanded < limit:
+            current = stack.pop()
+            expanded += 1
+            if current == goal:
+                self._finish(True)
+                return expanded
+            if depth[current] >= max_path_length:
+                continue
+            dirs = open_dirs[current]
+            for bit, step in moves:
+                if not dirs & bit:
+                    continue
+                neighbor = current + step
+                if neighbor not in parent:
+                    parent[neighbor] = current
+                    depth[neighbor] = depth[current] + 1
+                    stack.append(neighbor)
+        if not stack:
+            self._finish(False)
+        return expanded
+
+
+class BudgetedAStar(BudgetedSearch):
+    def __init__(self, maze, start_pos, target_pos, weight=1.0):
+        """
+        weight: hệ số nhân heuristic Manhattan (0 = UCS, 1 = A*, >1 = weighted A*).
+        """
+        super().__init__(maze, start_pos, target_pos)
+        self.weight = weight
+        # Khóa heap (f, g, x, y) và cách chọn parent khi trùng khóa giống Ghost.ucs/a_star
+        self.best = {self.start: 0}  # g tốt nhất đã đẩy vào heap
+        self.closed = set()
+        self.queue = [(0, 0, self._rank(self.start), self.start)]
+
+    def _rank(self, cell):
+        width = self.maze.width
+        return cell % width * self.maze.height + cell // width
+
+    def _run(self, limit):
+        queue, parent, best, closed = self.queue, self.parent, self.best, self.closed
+        goal, weight, maze = self.goal, self.weight, self.maze
+        width, height = maze.width, maze.height
+        tx, ty = self.target_pos
+        neighbor_start, neighbor_cells = maze.neighbor_start, maze.neighbor_cells
+        expanded = 0
+        while queue and expanded < limit:
+            f, g, _, current = heapq.heappop(queue)
+            expanded += 1
+            if current in closed:
+                continue
+            closed.add(current)
+            if current == goal:
+                self._finish(True)
+                return expanded
+            new_g = g + 1
+            for k in range(neighbor_start[current], neighbor_start[current + 1]):
+                neighbor = neighbor_cells[k]
+                if neighbor not in closed:
+                    old_g = best.get(neighbor, INF)
+                    if new_g < old_g:
+                        best[neighbor] = new_g
+                        parent[neighbor] = current
+                    elif new_g == old_g and path_less(maze, parent, current, parent[neighbor]):
+                        parent[neighbor] = current
+                    new_h = abs(neighbor % width - tx) + abs(neighbor // width - ty)
+                    rank = neighbor % width * height + neighbor // width
+                    heapq.heappush(queue, (new_g + weight * new_h, new_g, rank, neighbor))
+        if not queue:
+            self._finish(False)
+        return expanded
+
+
+class AnytimeAStar(BudgetedSearch):
+    def __init__(self, maze, start_pos, target_pos, initial_weight=3.0, weight_step=0.5):
+        """
+        Args:
+            initial_weight (float): Heuristic weight of the first search.
+            weight_step (float): Amount the weight drops after each solution.
+        """
+        super().__init__(maze, start_pos, target_pos)
+        self.weight = max(1.0, initial_weight)
+        self.weight_step = weight_step
+        self.g = {self.start: 0}  # Ô chưa có trong g: g = vô cùng
+        self.closed = {}  # id ô -> vòng (round) đóng nó; đóng trong vòng này khi bằng self.round
+        self.round = 0
+        self.incons = set()
+        self.queue = [(self.weight * self._h(self.start), 0, self.start)]
+        self.solutions = 0  # Số lần đã công bố một đường đi
+
+    def _h(self, cell):
+        width = self.maze.width
+        return abs(cell % width - self.target_pos[0]) + abs(cell // width - self.target_pos[1])
+
+    @property
+    def bound(self):
+        """Hệ số cận trên hiện tại: chi phí đường đi <= bound * tối ưu."""
+        return self.weight
+
+    def _run(self, limit):
+        queue, g, parent, closed, goal = self.queue, self.g, self.parent, self.closed, self.goal
+        width, weight, current_round = self.maze.width, self.weight, self.round
+        tx, ty = self.target_pos
+        neighbor_start, neighbor_cells = self.maze.neighbor_start, self.maze.neighbor_cells
+        expanded = 0
+        while expanded < limit:
+            # Bỏ các phần tử cũ (g đã giảm hoặc ô đã đóng trong vòng này)
+            while queue and (queue[0][1] != g[queue[0][2]] or closed.get(queue[0][2]) == current_round):
+                heapq.heappop(queue)
+            if not queue or g.get(goal, INF) <= queue[0][0]:
+                self._improved()
+                return expanded
+            _, cost, current = heapq.heappop(queue)
+            closed[current] = current_round
+            expanded += 1
+            new_g = cost + 1
+            for k in range(neighbor_start[current], neighbor_start[current + 1]):
+                neighbor = neighbor_cells[k]
+                if new_g < g.get(neighbor, INF):
+                    g[neighbor] = new_g
+                    parent[neighbor] = current
+                    if closed.get(neighbor) == current_round:
+                        self.incons.add(neighbor)
+                    else:
+                        h = abs(neighbor % width - tx) + abs(neighbor // width - ty)
+                        heapq.heappush(queue, (new_g + weight * h, new_g, neighbor))
+        return expanded
+
+    def _improved(self):
+        """Một vòng ImprovePath xong: công bố đường đi rồi giảm weight hoặc kết thúc."""
+        g = self.g
+        if self.goal not in g:
+            self._finish(False)
+            return
+        self.path = self._reconstruct(self.goal)
+        self.solutions += 1
+        if self.weight <= 1.0:
+            self.done = True
+            return
+        self.weight = max(1.0, self.weight - self.weight_step)
+        # Đưa OPEN và INCONS trở lại hàng đợi với weight mới; sang vòng mới là CLOSED rỗng
+        cells = {cell for _, cost, cell in self.queue if cost == g[cell]}
+        cells.update(self.incons)
+        self.incons = set()
+        self.round += 1
+        self.queue = [(g[cell] + self.weight * self._h(cell), g[cell], cell) for cell in cells]
+        heapq.heapify(self.queue)
@@ -0,0 +1,189 @@
+"""
+Background ghost planning so searches never block the game loop.
+
+AsyncPlanner submits each ghost's search to a thread or process pool and
+returns immediately; the ghost keeps following its previous path until
+the result arrives. Every request carries an id, and results older than
+the last invalidation (life lost, level restart) are dropped, as are
+results whose start cell the ghost has already left its path from.
+
+Searches run on private "shadow" ghosts, one per (ghost id, algorithm),
+so the live Ghost objects are only touched on the calling thread. At most
+one request per ghost is in flight, which keeps a shadow ghost (and its
+D* Lite tree) from being used by two workers at once. The process pool
+ships the maze to every worker once and is rebuilt if the layout changes
+(Maze.version).
+"""
+import concurrent.futures
+import logging
+
+from ghost import Ghost
+from metrics import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('thread', 'process')
+
+# Trạng thái riêng của mỗi process worker
+_worker_maze = None
+_worker_ghosts = None
+
+
+def _plan(ghosts, maze, ghost_id, algorithm, start, target, metrics_mode):
+    """Chạy một truy vấn trên ghost bóng; trả về (path, metrics không kèm path)."""
+    shadow = ghosts.get((ghost_id, algorithm))
+    if shadow is None:
+        shadow = ghosts[(ghost_id, algorithm)] = Ghost(
+            ghost_id, start, algorithm, 0, MetricsCollector(metrics_mode))
+    shadow.position = start
+    shadow.path = []  # Không để find_path tái sử dụng đường của truy vấn trước
+    metrics = shadow.find_path(maze, target)
+    return list(metrics["path"]), {"time": metrics["time"], "memory": metrics["memory"],
+                                   "nodes": metrics["nodes"]}
+
+
+def _init_worker(maze):
+    global _worker_maze, _worker_ghosts
+    _worker_maze = maze
+    _worker_ghosts = {}
+
+
+def _plan_in_worker(ghost_id, algorithm, start, target, metrics_mode):
+    return _plan(_worker_ghosts, _worker_maze, ghost_id, algorithm, start, target, metrics_mode)
+
+
+class AsyncPlanner:
+    def __init__(self, kind='thread', workers=None, metrics=None, path_cache=None):
+        """
+        Args:
+            kind (str): 'thread' (shares the maze, no startup cost) or
+                'process' (searches run outside the GIL).
+            workers (int, optional): Pool size; defaults to the executor's.
+            metrics (MetricsCollector, optional): Collector that receives a
+                record when a result is applied. Workers only time searches
+                ('timing'), since tracemalloc cannot attribute memory to one
+                of several concurrent searches.
+            path_cache (PathCache, optional): Checked before submitting and
+                filled with every result, on the calling thread only.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown planner kind: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.metrics = metrics
+        self.path_cache = path_cache
+        self.worker_mode = 'off' if metrics is not None and metrics.mode == 'off' else 'timing'
+        self._executor = None
+        self._maze_version = None
+        self._ghosts = {}       # Ghost bóng cho chế độ thread
+        self.pending = {}       # ghost id -> (request id, future, start, target)
+        self.next_id = 0
+        self.valid_from = {}    # ghost id -> request id nhỏ nhất còn hợp lệ
+        self.submitted = 0
+        self.applied = 0
+        self.discarded = 0
+
+    def _pool(self, maze):
+        if self.kind == 'thread':
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="ghost-planner")
+            return self._executor
+        if self._executor is None or self._maze_version != maze.version:
+            # Worker giữ bản sao maze: tạo lại pool khi bố cục đổi
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                self.workers, initializer=_init_worker, initargs=(maze,))
+            self._maze_version = maze.version
+        return self._executor
+
+    def _submit(self, ghost, maze, target_pos):
+        request_id = self.next_id
+        self.next_id += 1
+        start = ghost.position
+        if self.kind == 'thread':
+            future = self._pool(maze).submit(_plan, self._ghosts, maze, ghost.id, ghost.algorithm,
+                                             start, target_pos, self.worker_mode)
+        else:
+            future = self._pool(maze).submit(_plan_in_worker, ghost.id, ghost.algorithm,
+                                             start, target_pos, self.worker_mode)
+        self.pending[ghost.id] = (request_id, future, start, target_pos)
+        self.submitted += 1
+
+    def _apply(self, ghost, maze, path, metrics, start, target_pos, cached=False):
+        """Gắn đường đi vào ghost nếu ghost vẫn đứng trên đường đó; trả về True nếu đã dùng."""
+        if ghost.position != start:
+            if ghost.position not in path:
+                return False
+            path = path[path.index(ghost.position) + 1:]
+        ghost.path = list(path)
+        ghost.last_target = target_pos
+        entry = dict(metrics, path=ghost.path)
+        if cached:
+            entry["cached"] = True
+        ghost._record_metrics(entry)
+        return True
+
+    def update(self, ghost, maze, target_pos):
+        """
+        Apply a finished result for ghost and submit a new request if needed.
+
+        Never waits on a search. Call once per tick before ghost.move(...,
+        plan=False).
+
+        Returns:
+            bool: True if ghost received a new path this call.
+        """
+        applied = False
+        pending = self.pending.get(ghost.id)
+        if pending is not None:
+            request_id, future, start, request_target = pending
+            if not future.done():
+                return False
+            del self.pending[ghost.id]
+            try:
+                path, metrics = future.result()
+            except Exception as e:
+                logger.exception("Background search failed for Ghost %s: %s", ghost.id, e)
+                path = None
+            if path is None or request_id < self.valid_from.get(ghost.id, 0):
+                self.discarded += 1
+            elif self._apply(ghost, maze, path, metrics, start, request_target):
+                self.applied += 1
+                applied = True
+                if self.path_cache is not None:
+                    key = self.path_cache.key(ghost.algorithm, start, request_target, maze)
+                    self.path_cache.put(key, path)
+            else:
+                self.discarded += 1
+
+        if ghost.path and ghost.last_target == target_pos:
+            return applied
+        if self.path_cache is not None:
+            cached = self.path_cache.get(
+                self.path_cache.key(ghost.algorithm, ghost.position, target_pos, maze))
+            if cached is not None:
+                self._apply(ghost, maze, cached, {"time": 0.0, "memory": 0.0, "nodes": 0},
+                            ghost.position, target_pos, cached=True)
+                return True
+        self._submit(ghost, maze, target_pos)
+        return applied
+
+    def invalidate(self, ghost_id=None):
+        """Bỏ mọi kết quả đang chờ của một ghost (hoặc mọi ghost khi ghost_id là None)."""
+        for key in ([ghost_id] if ghost_id is not None else list(self.pending)):
+            self.valid_from[key] = self.next_id
+
+    def wait(self, timeout=None):
+        """Chờ mọi yêu cầu đang chạy xong (dùng cho test và chạy headless)."""
+        concurrent.futures.wait([pending[1] for pending in self.pending.values()], timeout)
+
+    def stats(self):
+        return {"kind": self.kind, "submitted": self.submitted, "applied": self.applied,
+                "discarded": self.discarded, "in_flight": len(self.pending)}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,54 @@
+"""
+Autopilot Pac-Man for levels 1-5.
+
+Pac-Man heads for the nearest remaining dot, found with one multi-goal
+BFS over the live dot set (Maze.nearest_goal), and follows that path
+until the dot is gone or it is knocked off the path (life lost). Ghost
+cells are avoided when planning, so it gives the ghost planners a
+moving target that behaves roughly like a player.
+
+Usage:
+    sim = Simulation(5, autopilot=True)
+    python main.py --autopilot
+"""
+
+
+class Autopilot:
+    def __init__(self, avoid_ghosts=True):
+        """
+        Args:
+            avoid_ghosts (bool): Route around cells currently held by ghosts.
+        """
+        self.avoid_ghosts = avoid_ghosts
+        self.path = []      # Các ô còn phải đi tới chấm mục tiêu
+        self.goal = None
+        self.searches = 0   # Số lần tìm đường (mỗi lần một BFS đa đích)
+        self.nodes = 0
+
+    def __call__(self, sim):
+        """Direction for the next tick; only decides when Pac-Man is on a cell."""
+        pacman, maze = sim.pacman, sim.maze
+        if pacman.move_progress != 0.0:
+            return (0, 0)
+        x, y = pacman.position
+        if self.path and self.path[0] == (x, y):
+            self.path.pop(0)
+        # Tìm lại khi chấm mục tiêu đã bị ăn, hết đường, hoặc Pac-Man không còn đứng cạnh đường
+        if (self.goal not in maze.dots or not self.path
+                or abs(self.path[0][0] - x) + abs(self.path[0][1] - y) != 1):
+            avoid = [ghost.position for ghost in sim.ghosts] if self.avoid_ghosts else ()
+            self.goal, self.path, nodes = maze.nearest_goal((x, y), maze.dots, avoid=avoid)
+            if self.goal is None and avoid:
+                # Ghost chặn mọi lối: vẫn đi tới chấm gần nhất
+                self.goal, self.path, more = maze.nearest_goal((x, y), maze.dots)
+                nodes += more
+            self.searches += 1
+            self.nodes += nodes
+        if not self.path:
+            return (0, 0)
+        nx, ny = self.path[0]
+        return (nx - x, ny - y)
+
+    def reset(self):
+        self.path = []
+        self.goal = None
@@ -0,0 +1,316 @@
+"""
+Benchmark the ghost pathfinding algorithms over many start/target pairs.
+
+Pairs are enumerated (``--all``) or sampled from the ghost-walkable cells,
+split into chunks and spread over a multiprocessing pool. Aggregates per
+algorithm (time percentiles, nodes expanded, path length, optimality gap vs
+BFS) are printed and optionally written to CSV/JSON.
+
+``--moving-target N`` replaces independent pairs with chase tracks of N
+queries: Pac-Man runs along corridors (turning at random at junctions)
+one step per query and the ghost takes a step along its shortest path
+every other query, as in the game. Each track
+runs on one ghost object, so incremental planners (D*LITE) are measured
+on the workload they are built for.
+
+Usage:
+    python benchmark.py --pairs 5000 --csv results.csv
+    python benchmark.py --all --json results.json --workers 8
+    python benchmark.py --generate 300 300 --algorithms BFS A* JPS --metrics-mode timing
+    python benchmark.py --moving-target 200 --algorithms A* D*LITE --metrics-mode timing
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import random
+import time
+from collections import OrderedDict
+
+import maze_io
+from maze import Maze
+from ghost import Ghost, ALGORITHMS
+from metrics import MetricsCollector, MODES
+
+CHUNK_SIZE = 256
+# TABLE dựng bảng APSP O(n^2) trong mỗi worker: quá giới hạn này thì treo hoặc MemoryError
+TABLE_MAX_CELLS = 2500
+ORACLE_CACHE = 8  # Số bản đồ khoảng cách oracle giữ lại trong mỗi worker
+
+# Trạng thái riêng của mỗi process worker
+_worker_maze = None
+_worker_algorithms = None
+_worker_metrics = None
+_worker_oracle = None
+
+
+def _init_worker(algorithms, metrics_mode, oracle=False, maze=None):
+    global _worker_maze, _worker_algorithms, _worker_metrics, _worker_oracle
+    _worker_maze = maze or Maze()
+    _worker_algorithms = algorithms
+    _worker_metrics = MetricsCollector(metrics_mode)
+    if oracle:
+        # Chỉ cần NumPy khi bật --oracle
+        import wavefront
+        passable = wavefront.passable_array(_worker_maze)
+        maps = OrderedDict()  # LRU: mỗi bản đồ tốn width*height*4 byte
+
+        def _oracle(start, target):
+            # Đồ thị vô hướng: d(start, target) đọc được từ bản đồ của đầu nào cũng được
+            for source, cell in ((start, target), (target, start)):
+                if source in maps:
+                    maps.move_to_end(source)
+                    break
+            else:
+                # --all duyệt theo start nên bản đồ từ start được dùng lại cho cả hàng
+                source, cell = start, target
+                maps[source] = wavefront.distance_map(_worker_maze, source, passable)
+                if len(maps) > ORACLE_CACHE:
+                    maps.popitem(last=False)
+            d = int(maps[source][cell[1], cell[0]])
+            return d if d >= 0 else None
+        _worker_oracle = _oracle
+
+
+def _run_chunk(pairs):
+    """Chạy mọi thuật toán trên một nhóm cặp (start, target) trong process worker."""
+    maze = _worker_maze
+    ghosts = {algorithm: Ghost('B', pairs[0][0], algorithm, 20) for algorithm in _worker_algorithms}
+    results = {algorithm: [] for algorithm in _worker_algorithms}
+    for start, target in pairs:
+        lengths = {}
+        for algorithm, ghost in ghosts.items():
+            ghost.position = start
+            token = _worker_metrics.begin()
+            result = ghost.search(maze, target)
+            elapsed, memory = _worker_metrics.end(token)
+            found = bool(result["path"]) or start == target
+            lengths[algorithm] = len(result["path"]) if found else None
+            results[algorithm].append([elapsed * 1e6, result["nodes"], lengths[algorithm], None, memory])
+        # Khoảng cách tối ưu tham chiếu: oracle wavefront, kết quả BFS, hoặc một lượt BFS từ target
+        # (không dùng maze.distance: nó dựng cả bảng APSP O(n^2))
+        if _worker_oracle:
+            optimal = _worker_oracle(start, target)
+        elif 'BFS' in lengths:
+            optimal = lengths['BFS']
+        else:
+            optimal = maze.goal_distances(target, [start], pacman=False).get(start)
+        if optimal is not None and optimal >= 0:
+            for algorithm in ghosts:
+                length = lengths[algorithm]
+                if length is not None:
+                    results[algorithm][-1][3] = length - optimal
+    return results
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(q / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def _region(maze):
+    """Id các ô nối được với ô xuất phát của Pac-Man (hoặc ô đi được đầu tiên), tăng dần."""
+    start = maze.cell_id(*maze.pacman_pos) if maze.pacman_pos else maze.ghost_pass.index(1)
+    seen = {start}
+    stack = [start]
+    while stack:
+        for neighbor in maze.neighbors(stack.pop()):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                stack.append(neighbor)
+    return sorted(seen)
+
+
+def make_pairs(maze, count=None, seed=0):
+    """
+    Build the (start, target) pairs to benchmark.
+
+    Only cells in the region reachable from Pac-Man's start are used, so
+    isolated pockets inside wall blocks do not turn into failed queries.
+
+    Args:
+        maze (Maze): Maze to draw walkable cells from.
+        count (int, optional): Number of random pairs; None enumerates all pairs.
+        seed (int): Seed for sampling.
+    """
+    cells = [maze.cell_pos(c) for c in _region(maze)]
+    if count is None:
+        return [(s, t) for s in cells for t in cells if s != t]
+    rng = random.Random(seed)
+    return [tuple(rng.sample(cells, 2)) for _ in range(count)]
+
+
+def make_tracks(maze, count, length, seed=0, ghost_every=2):
+    """
+    Build chase tracks: consecutive (ghost, Pac-Man) queries of a moving target.
+
+    Args:
+        maze (Maze): Maze to walk on.
+        count (int): Number of tracks.
+        length (int): Queries per track.
+        seed (int): Seed for the start cells and Pac-Man's turns.
+        ghost_every (int): The ghost steps along its shortest path once
+            every this many queries (ghosts are half as fast as Pac-Man).
+
+    Returns:
+        list: ``count * length`` pairs, track after track.
+    """
+    region = _region(maze)
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(count):
+        ghost, target = rng.sample(region, 2)
+        previous = -1
+        for i in range(length):
+            pairs.append((maze.cell_pos(ghost), maze.cell_pos(target)))
+            # Pac-Man đi thẳng theo hành lang, chỉ rẽ ngẫu nhiên ở ngã rẽ; quay đầu khi vào ngõ cụt
+            straight = 2 * target - previous
+            options = [n for n in maze.neighbors(target) if n != previous] or [previous]
+            if straight not in options or len(options) > 1 and rng.random() < 0.5:
+                previous, target = target, rng.choice(options)
+            else:
+                previous, target = target, straight
+            if i % ghost_every == ghost_every - 1 and ghost != target:
+                _, path, _ = maze.nearest_goal(maze.cell_pos(ghost), [maze.cell_pos(target)], pacman=False)
+                if path:
+                    ghost = maze.cell_id(*path[0])
+    return pairs
+
+
+def aggregate(results):
+    """Gộp kết quả thô của từng thuật toán thành các chỉ số tổng hợp."""
+    rows = []
+    for algorithm, records in results.items():
+        times = sorted(r[0] for r in records)  # micro giây
+        nodes = sorted(r[1] for r in records)
+        memory = sorted(r[4] for r in records)  # KB, 0 nếu không đo bộ nhớ
+        lengths = [r[2] for r in records if r[2] is not None]
+        gaps = [r[3] for r in records if r[3] is not None]
+        n = len(records)
+        rows.append({
+            "algorithm": algorithm,
+            "queries": n,
+            "found": len(lengths),
+            "time_mean_us": sum(times) / n if n else 0.0,
+            "time_p50_us": _percentile(times, 50),
+            "time_p90_us": _percentile(times, 90),
+            "time_p99_us": _percentile(times, 99),
+            "nodes_mean": sum(nodes) / n if n else 0.0,
+            "nodes_p50": _percentile(nodes, 50),
+            "nodes_max": nodes[-1] if nodes else 0,
+            "memory_p50_kb": _percentile(memory, 50),
+            "memory_max_kb": memory[-1] if memory else 0.0,
+            "path_length_mean": sum(lengths) / len(lengths) if lengths else 0.0,
+            "gap_mean": sum(gaps) / len(gaps) if gaps else 0.0,
+            "gap_max": max(gaps) if gaps else 0,
+            "suboptimal_rate": sum(1 for g in gaps if g > 0) / len(gaps) if gaps else 0.0,
+        })
+    return rows
+
+
+def run_benchmark(pairs, algorithms=ALGORITHMS, workers=None, chunk_size=CHUNK_SIZE,
+                  metrics_mode='full', oracle=False, maze=None):
+    """
+    Run every algorithm on every pair across a process pool.
+
+    The default 'full' metrics mode traces peak memory of every search;
+    use 'timing' for time figures free of tracemalloc overhead. With
+    oracle=True the optimality gap is measured against NumPy wavefront
+    distance maps instead of BFS, which also validates BFS itself.
+    maze (a loaded or generated Maze) replaces the built-in board.
+
+    Returns:
+        list: One aggregate dict per algorithm.
+    """
+    chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+    results = {algorithm: [] for algorithm in algorithms}
+    with multiprocessing.Pool(workers or os.cpu_count(), _init_worker,
+                              (tuple(algorithms), metrics_mode, oracle, maze)) as pool:
+        for chunk_results in pool.imap_unordered(_run_chunk, chunks):
+            for algorithm, records in chunk_results.items():
+                results[algorithm].extend(records)
+    return aggregate(results)
+
+
+def write_csv(rows, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_json(rows, path, meta=None):
+    with open(path, "w") as f:
+        json.dump({"meta": meta or {}, "results": rows}, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ghost pathfinding algorithms.")
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS,
+                        help=f"default: all (TABLE only on mazes up to {TABLE_MAX_CELLS} walkable cells)")
+    parser.add_argument("--pairs", type=int, default=2000, help="number of random start/target pairs")
+    parser.add_argument("--all", action="store_true", help="enumerate every pair of walkable cells")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--metrics-mode", choices=MODES, default='full',
+                        help="measurement level per search (default: full memory tracing)")
+    parser.add_argument("--oracle", action="store_true",
+                        help="measure optimality against NumPy wavefront distance maps")
+    parser.add_argument("--maze", help="benchmark on this maze file (see maze_io.py)")
+    parser.add_argument("--generate", nargs=2, type=int, metavar=("WIDTH", "HEIGHT"),
+                        help="benchmark on a generated maze of this size (seeded by --seed)")
+    parser.add_argument("--moving-target", type=int, metavar="LENGTH",
+                        help="run --pairs queries as chase tracks of LENGTH consecutive queries")
+    parser.add_argument("--csv", help="write aggregate results to this CSV file")
+    parser.add_argument("--json", help="write aggregate results to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.maze:
+        maze = maze_io.load_maze(args.maze)
+    elif args.generate:
+        maze = maze_io.generate_maze(*args.generate, seed=args.seed)
+    else:
+        maze = Maze()
+    cells = sum(maze.ghost_pass)
+    algorithms = args.algorithms
+    if algorithms is None:
+        algorithms = [a for a in ALGORITHMS if a != 'TABLE' or cells <= TABLE_MAX_CELLS]
+    elif 'TABLE' in algorithms and cells > TABLE_MAX_CELLS:
+        parser.error(f"TABLE needs an all-pairs table of {cells}x{cells} entries; "
+                     f"it is limited to mazes with at most {TABLE_MAX_CELLS} walkable cells")
+    chunk_size = args.chunk_size
+    if args.moving_target:
+        # Mỗi chunk là đúng một track để ghost (và cây D* Lite) đi cùng track đó
+        chunk_size = args.moving_target
+        pairs = make_tracks(maze, max(1, args.pairs // chunk_size), chunk_size, args.seed)
+    else:
+        pairs = make_pairs(maze, None if args.all else args.pairs, args.seed)
+    begin = time.perf_counter()
+    rows = run_benchmark(pairs, algorithms, args.workers, chunk_size, args.metrics_mode,
+                         args.oracle, maze)
+    elapsed = time.perf_counter() - begin
+
+    print(f"{len(pairs)} pairs x {len(algorithms)} algorithms in {elapsed:.2f}s")
+    print(f"{'algorithm':<10}{'found':>8}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}"
+          f"{'nodes':>10}{'mem KB':>9}{'length':>9}{'gap':>8}")
+    for row in rows:
+        print(f"{row['algorithm']:<10}{row['found']:>8}{row['time_p50_us']:>10.1f}"
+              f"{row['time_p90_us']:>10.1f}{row['time_p99_us']:>10.1f}{row['nodes_mean']:>10.1f}"
+              f"{row['memory_p50_kb']:>9.1f}"
+              f"{row['path_length_mean']:>9.1f}{row['gap_mean']:>8.2f}")
+
+    meta = {"pairs": len(pairs), "seed": args.seed, "metrics_mode": args.metrics_mode,
+            "oracle": args.oracle, "moving_target": args.moving_target, "elapsed_s": elapsed,
+            "width": maze.width, "height": maze.height}
+    if args.csv:
+        write_csv(rows, args.csv)
+    if args.json:
+        write_json(rows, args.json, meta)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Moving-target D* Lite (MT-D* Lite) for a ghost chasing Pac-Man.
+
+The search runs forward from the ghost (the hunter) to Pac-Man and keeps
+its tree between calls, following Sun, Yeoh & Koenig's MT-D* Lite:
+
+- Pac-Man moving only changes the goal. The tree rooted at the ghost stays
+  valid; the heuristic shift is absorbed by the key modifier km, and the
+  search only expands until the new goal is proven, often nothing at all
+  when that cell is already settled.
+- The ghost moving to a cell of its tree keeps the subtree rooted there
+  (its g-values are still exact, offset by the new root's g) and deletes
+  the rest: deleted cells are re-seeded from kept neighbours and repaired
+  lazily by the next compute_shortest_path().
+
+g-values keep the origin of the first search, so keeping a subtree never
+touches its cells; the path cost is g[goal] - g[start].
+"""
+import heapq
+
+INF = float('inf')
+
+
+class DStarLite:
+    def __init__(self, maze, start_pos, goal_pos):
+        """
+        Args:
+            maze (Maze): Maze whose CSR neighbor table is searched.
+            start_pos (tuple): Ghost cell (x, y), root of the search tree.
+            goal_pos (tuple): Pac-Man cell (x, y).
+        """
+        self.maze = maze
+        self.deleted = 0  # Tổng số ô bị xóa khỏi cây khi ghost di chuyển
+        self.rebuilds = 0  # Số lần phải xây lại cây (ghost rời khỏi cây)
+        self._reset(maze.cell_id(*start_pos), maze.cell_id(*goal_pos))
+
+    def _reset(self, start, goal):
+        maze = self.maze
+        self.start = start
+        self.goal = goal
+        self.km = 0
+        self.g = [INF] * maze.size
+        self.rhs = [INF] * maze.size
+        self.parent = [-1] * maze.size
+        self.rhs[self.start] = 0
+        self.queue = []
+        self.queued = {}  # cell -> khóa hiện hành; phần tử heap lệch khóa là phần tử cũ
+        self._push(self.start)
+
+    def _h(self, cell):
+        width = self.maze.width
+        goal = self.goal
+        return abs(cell % width - goal % width) + abs(cell // width - goal // width)
+
+    def _key(self, cell):
+        m = min(self.g[cell], self.rhs[cell])
+        return (m + self._h(cell) + self.km, m)
+
+    def _push(self, cell):
+        key = self._key(cell)
+        self.queued[cell] = key
+        heapq.heappush(self.queue, (key, cell))
+
+    def _update_state(self, cell):
+        self.queued.pop(cell, None)
+        if self.g[cell] != self.rhs[cell]:
+            self._push(cell)
+
+    def _best_parent(self, cell):
+        """Đặt rhs/parent của cell theo láng giềng có g nhỏ nhất (đồ thị vô hướng, chi phí 1)."""
+        maze, g = self.maze, self.g
+        best, parent = INF, -1
+        for k in range(maze.neighbor_start[cell], maze.neighbor_start[cell + 1]):
+            neighbor = maze.neighbor_cells[k]
+            if g[neighbor] + 1 < best:
+                best, parent = g[neighbor] + 1, neighbor
+        self.rhs[cell] = best
+        self.parent[cell] = parent
+
+    def compute_shortest_path(self):
+        """
+        Expand until the goal is locally consistent and no queued cell can
+        still improve it.
+
+        Returns:
+            int: Number of vertex expansions.
+        """
+        maze = self.maze
+        g, rhs, parent = self.g, self.rhs, self.parent
+        queue, queued = self.queue, self.queued
+        neighbor_start, neighbor_cells = maze.neighbor_start, maze.neighbor_cells
+        start, goal, km, width = self.start, self.goal, self.km, maze.width
+        gx, gy = goal % width, goal // width
+        heappush, heappop = heapq.heappush, heapq.heappop
+        expanded_nodes = 0
+        while queue:
+            key, cell = queue[0]
+            if queued.get(cell) != key:
+                heappop(queue)  # Phần tử heap đã lỗi thời
+                continue
+            goal_g, goal_rhs = g[goal], rhs[goal]
+            if goal_g == goal_rhs and key >= (goal_g + km, goal_g):
+                break
+            cell_g, cell_rhs = g[cell], rhs[cell]
+            m = cell_g if cell_g < cell_rhs else cell_rhs
+            new_key = (m + abs(cell % width - gx) + abs(cell // width - gy) + km, m)
+            if key < new_key:
+                # Khóa cũ (km đã tăng): cập nhật khóa, không tính là mở rộng
+                queued[cell] = new_key
+                heapq.heapreplace(queue, (new_key, cell))
+                continue
+            heappop(queue)
+            del queued[cell]
+            expanded_nodes += 1
+            if cell_g > cell_rhs:
+                # Over-consistent (trường hợp thường gặp): chốt g rồi nới lỏng láng giềng, viết gọn tại chỗ
+                g[cell] = cell_rhs
+                cost = cell_rhs + 1
+                for k in range(neighbor_start[cell], neighbor_start[cell + 1]):
+                    neighbor = neighbor_cells[k]
+                    if neighbor != start and cost < rhs[neighbor]:
+                        rhs[neighbor] = cost
+                        parent[neighbor] = cell
+                        neighbor_g = g[neighbor]
+                        if neighbor_g != cost:
+                            m = neighbor_g if neighbor_g < cost else cost
+                            neighbor_key = (m + abs(neighbor % width - gx) + abs(neighbor // width - gy) + km, m)
+                            queued[neighbor] = neighbor_key
+                            heappush(queue, (neighbor_key, neighbor))
+                        else:
+                            queued.pop(neighbor, None)
+            else:
+                g[cell] = INF
+                if cell != start:
+                    self._best_parent(cell)
+                self._update_state(cell)
+                for k in range(neighbor_start[cell], neighbor_start[cell + 1]):
+                    neighbor = neighbor_cells[k]
+                    if neighbor != start and parent[neighbor] == cell:
+                        self._best_parent(neighbor)
+                        self._update_state(neighbor)
+        return expanded_nodes
+
+    def _move_start(self, start):
+        """
+        Re-root the tree at start (a cell of the current tree): keep its
+        subtree, delete every other cell and re-seed it from kept neighbours.
+        """
+        maze = self.maze
+        g, rhs, parent = self.g, self.rhs, self.parent
+        neighbor_start, neighbor_cells = maze.neighbor_start, maze.neighbor_cells
+        # Cắt gốc mới khỏi cây rồi duyệt xuống từ gốc cũ: chỉ đi qua phần bị xóa, không chạm cây con giữ lại
+        parent[start] = -1
+        deleted = [self.start]
+        stack = [self.start]
+        while stack:
+            cell = stack.pop()
+            for k in range(neighbor_start[cell], neighbor_start[cell + 1]):
+                neighbor = neighbor_cells[k]
+                if parent[neighbor] == cell:
+                    deleted.append(neighbor)
+                    stack.append(neighbor)
+        for cell in deleted:
+            g[cell] = rhs[cell] = INF
+            parent[cell] = -1
+            self.queued.pop(cell, None)
+        self.start = start
+        # rhs của gốc mới giữ nguyên: đó là gốc tọa độ của mọi g trong cây con
+        for cell in deleted:
+            self._best_parent(cell)
+            self._update_state(cell)
+        self.deleted += len(deleted)
+
+    def update(self, start_pos, goal_pos):
+        """
+        Move the ghost and/or Pac-Man and repair the search tree.
+
+        Returns:
+            int: Number of vertex expansions needed for the repair.
+        """
+        maze = self.maze
+        start = maze.cell_id(*start_pos)
+        goal = maze.cell_id(*goal_pos)
+        if goal != self.goal:
+            # Đích đổi: h giảm nhiều nhất h(đích cũ, đích mới) (_h vẫn đo tới đích cũ), bù bằng km
+            self.km += self._h(goal)
+            self.goal = goal
+        if start != self.start:
+            if self.rhs[start] == INF:
+                # Ghost không nằm trên cây (bị reset, hoặc nhảy xa): xây lại từ đầu
+                self.rebuilds += 1
+                self._reset(start, goal)
+            else:
+                self._move_start(start)
+        return self.compute_shortest_path()
+
+    def path(self):
+        """Đường đi hiện tại từ ghost đến Pac-Man (không gồm ô xuất phát)."""
+        maze = self.maze
+        cell = self.goal
+        if cell == self.start:
+            return []
+        if self.g[cell] == INF:
+            return []
+        path = []
+        while cell != self.start:
+            path.append(maze.cell_pos(cell))
+            cell = self.parent[cell]
+            if cell < 0:
+                return []
+        path.reverse()
+        return path
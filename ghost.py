@@ -1,10 +1,38 @@
 import heapq
 import collections
-import tracemalloc
+import logging
 import time
 
+from metrics import default_collector
+from dstar_lite import DStarLite
+from planning import SharedPlanner
+from maze import DIRECTIONS
+from anytime import BudgetedBFS, BudgetedDFS, BudgetedAStar, AnytimeAStar, search_moves, path_less
+
+logger = logging.getLogger(__name__)
+
+# Các thuật toán Ghost.search hỗ trợ
+ALGORITHMS = ('BFS', 'DFS', 'UCS', 'A*', 'TABLE', 'D*LITE', 'FIELD', 'JPS', 'HPA', 'BI-BFS', 'BI-A*',
+              'ARA*')
+
+# Thuật toán có phiên bản chạy tiếp qua nhiều frame (anytime.py), dùng khi ghost có budget
+RESUMABLE = ('BFS', 'DFS', 'UCS', 'A*', 'ARA*')
+
+# Giới hạn độ dài đường đi của DFS (tính cả ô xuất phát)
+DFS_MAX_PATH_LENGTH = 30
+
+# Chế độ của ghost: đuổi theo Pac-Man, hoảng sợ (sau power pellet), bị ăn (quay về nhà)
+CHASE = 'chase'
+FRIGHTENED = 'frightened'
+EATEN = 'eaten'
+
+GHOST_SPEED = 0.05
+EATEN_SPEED = 0.2  # Ghost bị ăn chạy về nhà nhanh gấp 4 lần
+
+
 class Ghost:
-    def __init__(self, id, start_pos, algorithm, cell_size):
+    def __init__(self, id, start_pos, algorithm, cell_size, metrics=None, planner=None, path_cache=None,
+                 node_budget=None, time_budget_us=None):
         self.id = id
         self.start_pos = start_pos
         self.position = start_pos
@@ -14,106 +42,110 @@ class Ghost:
         )
         self.algorithm = algorithm
         self.path = []
-        self.speed = 0.05  # Tăng tốc độ để di chuyển nhanh hơn
+        self.speed = GHOST_SPEED  # Tăng tốc độ để di chuyển nhanh hơn
         self.move_progress = 0.0
         self.cell_size = cell_size
         self.previous_position = None
         self.last_target = None
-        self.metrics_history = []  # Lưu trữ lịch sử metric
+        self.metrics = metrics or default_collector  # Bộ thu thập metric dùng chung
+        self.last_metrics = None  # Metric của lần find_path gần nhất
+        self.dstar = None  # Cây tìm kiếm D* Lite giữ lại giữa các lần gọi
+        self.planner = planner  # SharedPlanner dùng chung cho chế độ 'FIELD'
+        self.path_cache = path_cache  # PathCache LRU dùng chung giữa các ghost (tùy chọn)
+        # Budget mỗi lần find_path cho các thuật toán RESUMABLE (None: chạy đến khi xong)
+        self.node_budget = node_budget
+        self.time_budget_us = time_budget_us
+        self.resumable = None  # Tìm kiếm đang dở, chạy tiếp ở frame sau
+        self.mode = CHASE
 
     def find_path(self, maze, target_pos):
-        print(f"Computing path for Ghost {self.id} from {self.position} to {target_pos}")
+        logger.debug("Computing path for Ghost %s from %s to %s", self.id, self.position, target_pos)
+
+        # Khởi tạo metrics cho mọi trường hợp (mức đo do collector quyết định)
+        token = self.metrics.begin()
 
-        # Khởi tạo metrics cho mọi trường hợp
-        tracemalloc.start()
-        start_time = time.time()
-        
         # Kiểm tra tính hợp lệ của target_pos
         valid_moves = maze.get_valid_moves(target_pos[0], target_pos[1])
         if not valid_moves and (target_pos[0], target_pos[1]) != self.position:
-            print(f"Invalid target position {target_pos} for Ghost {self.id} (no valid moves)")
-            current, peak = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-            end_time = time.time()
+            logger.info("Invalid target position %s for Ghost %s (no valid moves)", target_pos, self.id)
+            elapsed, memory = self.metrics.end(token)
             return {
                 "path": [],
-                "time": end_time - start_time,
-                "memory": peak / 1024,
+                "time": elapsed,
+                "memory": memory,
                 "nodes": 0
             }
 
-        # Tái sử dụng đường đi nếu có thể
-        if (self.path and self.last_target == target_pos and
+        # Tái sử dụng đường đi nếu có thể (trừ khi còn tìm kiếm đang dở cần chạy tiếp)
+        if (self.path and self.last_target == target_pos and self.resumable is None and
                 any((self.position[0] + dx, self.position[1] + dy) in self.path
                     for dx, dy in [(0, 0), (0, -1), (1, 0), (0, 1), (-1, 0)])):
-            print(f"Ghost {self.id} reusing existing path to {target_pos}")
-            
+            logger.debug("Ghost %s reusing existing path to %s", self.id, target_pos)
+
             # Đo thời gian và bộ nhớ cho quá trình kiểm tra và tái sử dụng
-            current, peak = tracemalloc.get_traced_memory()
-            end_time = time.time()
-            tracemalloc.stop()
-            
+            elapsed, memory = self.metrics.end(token)
             metrics = {
                 "path": self.path,
-                "time": end_time - start_time,
-                "memory": peak / 1024,
+                "time": elapsed,
+                "memory": memory,
                 "nodes": 1,  # Tính 1 nút cho quá trình kiểm tra
                 "reused": True
             }
-            
-            # Lưu metric vào lịch sử cho trường hợp tái sử dụng
-            self.metrics_history.append({
-                "ghost_id": self.id,
-                "algorithm": self.algorithm,
-                "time": metrics["time"],
-                "memory": metrics["memory"],
-                "nodes": metrics["nodes"],
-                "path_length": len(self.path),
-                "timestamp": time.time(),
-                "reused": True
-            })
-            
-            print(f"Reuse path metrics - Time: {metrics['time']:.6f}s, Memory: {metrics['memory']:.2f}KB, Nodes: {metrics['nodes']}")
+            self._record_metrics(metrics)
+
+            logger.debug("Reuse path metrics - Time: %.6fs, Memory: %.2fKB, Nodes: %d",
+                         metrics['time'], metrics['memory'], metrics['nodes'])
             return metrics
 
         self.last_target = target_pos
-        
+
+        # Tra cache dùng chung: ghost khác (hoặc mạng/cấp độ trước) có thể đã tìm đúng truy vấn này
+        cache_key = None
+        if self.path_cache is not None:
+            cache_key = self.path_cache.key(self.algorithm, self.position, target_pos, maze)
+            cached = self.path_cache.get(cache_key)
+            if cached is not None:
+                self.path = list(cached)
+                elapsed, memory = self.metrics.end(token)
+                metrics = {
+                    "path": self.path,
+                    "time": elapsed,
+                    "memory": memory,
+                    "nodes": 0,
+                    "cached": True
+                }
+                self._record_metrics(metrics)
+                logger.debug("Ghost %s path cache hit for %s -> %s", self.id, self.position, target_pos)
+                return metrics
+
         # Tiếp tục với thuật toán tìm đường như bình thường
-        peak_memory = 0
         result = None
-
         try:
-            if self.algorithm == 'BFS':
-                result = self.bfs(maze, target_pos)
-            elif self.algorithm == 'DFS':
-                result = self.dfs(maze, target_pos)
-            elif self.algorithm == 'UCS':
-                result = self.ucs(maze, target_pos)
-            elif self.algorithm == 'A*':
-                result = self.a_star(maze, target_pos)
-            else:
-                raise ValueError(f"Unknown algorithm: {self.algorithm}")
+            result = self.search(maze, target_pos)
         except Exception as e:
-            print(f"Error in pathfinding for Ghost {self.id}: {e}")
-        finally:
-            # Ghi lại bộ nhớ
-            current, peak = tracemalloc.get_traced_memory()
-            peak_memory = peak / 1024  # Chuyển đổi sang KB
-            tracemalloc.stop()
-
-        # Ghi lại thời gian
-        end_time = time.time()
-        
+            logger.exception("Error in pathfinding for Ghost %s: %s", self.id, e)
+        elapsed, memory = self.metrics.end(token)
+
         self.path = result["path"] if result else []
+        if cache_key is not None and result is not None and not result.get("partial"):
+            self.path_cache.put(cache_key, self.path)
         metrics = {
             "path": self.path,
-            "time": end_time - start_time,
-            "memory": peak_memory,
+            "time": elapsed,
+            "memory": memory,
             "nodes": result["nodes"] if result else 0
         }
-        
-        # Lưu metric vào lịch sử
-        self.metrics_history.append({
+        self._record_metrics(metrics)
+
+        logger.debug("Path computed: %s", self.path)
+        logger.debug("Metrics for %s - Time: %.6fs, Memory: %.2fKB, Nodes: %d",
+                     self.algorithm, metrics['time'], metrics['memory'], metrics['nodes'])
+        return metrics
+
+    def _record_metrics(self, metrics):
+        # Lưu metric vào collector chung (thay cho danh sách riêng của từng ghost)
+        self.last_metrics = metrics
+        entry = {
             "ghost_id": self.id,
             "algorithm": self.algorithm,
             "time": metrics["time"],
@@ -121,133 +153,582 @@ class Ghost:
             "nodes": metrics["nodes"],
             "path_length": len(self.path),
             "timestamp": time.time()
-        })
-        
-        print(f"Path computed: {self.path}")
-        print(f"Metrics for {self.algorithm} - Time: {metrics['time']:.6f}s, Memory: {metrics['memory']:.2f}KB, Nodes: {metrics['nodes']}")
-        return metrics
+        }
+        if metrics.get("reused"):
+            entry["reused"] = True
+        if metrics.get("cached"):
+            entry["cached"] = True
+        self.metrics.record(entry)
+
+    def search(self, maze, target_pos):
+        """Chạy thuật toán của ghost từ vị trí hiện tại, không đo metric."""
+        if self.algorithm in RESUMABLE and (self.algorithm == 'ARA*' or self.node_budget is not None
+                                            or self.time_budget_us is not None):
+            return self.budgeted_search(maze, target_pos)
+        if self.algorithm == 'BFS':
+            return self.bfs(maze, target_pos)
+        elif self.algorithm == 'DFS':
+            return self.dfs(maze, target_pos)
+        elif self.algorithm == 'UCS':
+            return self.ucs(maze, target_pos)
+        elif self.algorithm == 'A*':
+            return self.a_star(maze, target_pos)
+        elif self.algorithm == 'TABLE':
+            return self.table_lookup(maze, target_pos)
+        elif self.algorithm == 'D*LITE':
+            return self.d_star_lite(maze, target_pos)
+        elif self.algorithm == 'FIELD':
+            return self.field_descent(maze, target_pos)
+        elif self.algorithm == 'JPS':
+            return self.jps(maze, target_pos)
+        elif self.algorithm == 'HPA':
+            return self.hierarchical(maze, target_pos)
+        elif self.algorithm == 'BI-BFS':
+            return self.bidirectional_bfs(maze, target_pos)
+        elif self.algorithm == 'BI-A*':
+            return self.bidirectional_a_star(maze, target_pos)
+        else:
+            raise ValueError(f"Unknown algorithm: {self.algorithm}")
+
+    def _reconstruct_path(self, maze, parent, start, goal):
+        # Lần ngược mảng parent (theo id ô) từ đích về ô xuất phát, bỏ ô xuất phát
+        path = []
+        node = goal
+        while node != start:
+            path.append(maze.cell_pos(node))
+            node = parent[node]
+        path.reverse()
+        return path
 
     def bfs(self, maze, target_pos):
-        queue = collections.deque([(self.position, [self.position])])
-        visited = set([self.position])
+        start = maze.cell_id(*self.position)
+        goal = maze.cell_id(*target_pos)
+        open_dirs = maze.open_dirs
+        moves = search_moves(maze)
+        queue = collections.deque([start])
+        # Bộ đệm dùng lại giữa các lần tìm: ô đã thăm khi stamp == generation, không phải xóa O(bàn)
+        scratch = maze.search_scratch()
+        generation = scratch.begin()
+        stamp, parent, _, _ = scratch.side(0)
+        stamp[start] = generation
+        parent[start] = start
         expanded_nodes = 0
 
         while queue:
-            (x, y), path = queue.popleft()
+            current = queue.popleft()
             expanded_nodes += 1
-            if (x, y) == target_pos:
-                return {"path": path[1:] if len(path) > 1 else [], "nodes": expanded_nodes}
-
-            valid_moves = maze.get_valid_moves(x, y)
-            for dx, dy in [(0, -1), (1, 0), (0, 1), (-1, 0)]:
-                nx, ny = x + dx, y + dy
-                if (nx, ny) in valid_moves and (nx, ny) not in visited:
-                    visited.add((nx, ny))
-                    queue.append(((nx, ny), path + [(nx, ny)]))
-        print(f"BFS failed to find path for Ghost {self.id} to {target_pos}")
+            if current == goal:
+                return {"path": self._reconstruct_path(maze, parent, start, goal), "nodes": expanded_nodes}
+
+            dirs = open_dirs[current]
+            for bit, step in moves:
+                if not dirs & bit:
+                    continue
+                neighbor = current + step
+                if stamp[neighbor] != generation:
+                    stamp[neighbor] = generation
+                    parent[neighbor] = current
+                    queue.append(neighbor)
+        logger.debug("BFS failed to find path for Ghost %s to %s", self.id, target_pos)
         return {"path": [], "nodes": expanded_nodes}
 
     def dfs(self, maze, target_pos):
-        stack = [(self.position, [self.position])]
-        visited = set([self.position])
-        max_path_length = 30
+        start = maze.cell_id(*self.position)
+        goal = maze.cell_id(*target_pos)
+        open_dirs = maze.open_dirs
+        moves = search_moves(maze)
+        stack = [start]
+        scratch = maze.search_scratch()
+        generation = scratch.begin()
+        stamp, parent, depth, _ = scratch.side(0)  # depth: độ dài đường đi (tính cả ô xuất phát)
+        stamp[start] = generation
+        parent[start] = start
+        depth[start] = 1
+        max_path_length = DFS_MAX_PATH_LENGTH
         expanded_nodes = 0
 
         while stack:
-            current, path = stack.pop()
+            current = stack.pop()
             expanded_nodes += 1
-            if current == target_pos:
-                print(f"DFS found path for Ghost {self.id}: {path[1:]}")
-                return {"path": path[1:] if len(path) > 1 else [], "nodes": expanded_nodes}
+            if current == goal:
+                path = self._reconstruct_path(maze, parent, start, goal)
+                logger.debug("DFS found path for Ghost %s: %s", self.id, path)
+                return {"path": path, "nodes": expanded_nodes}
 
-            if len(path) >= max_path_length:
+            if depth[current] >= max_path_length:
                 continue
 
-            valid_moves = maze.get_valid_moves(current[0], current[1])
-            for dx, dy in [(0, -1), (1, 0), (0, 1), (-1, 0)]:
-                neighbor = (current[0] + dx, current[1] + dy)
-                if neighbor in valid_moves and neighbor not in visited:
-                    visited.add(neighbor)
-                    stack.append((neighbor, path + [neighbor]))
-        print(f"DFS failed to find path for Ghost {self.id} to {target_pos}")
+            dirs = open_dirs[current]
+            for bit, step in moves:
+                if not dirs & bit:
+                    continue
+                neighbor = current + step
+                if stamp[neighbor] != generation:
+                    stamp[neighbor] = generation
+                    parent[neighbor] = current
+                    depth[neighbor] = depth[current] + 1
+                    stack.append(neighbor)
+        logger.debug("DFS failed to find path for Ghost %s to %s", self.id, target_pos)
         return {"path": [], "nodes": expanded_nodes}
 
     def ucs(self, maze, target_pos):
-        pq = [(0, self.position, [self.position])]
-        visited = set()
+        start = maze.cell_id(*self.position)
+        goal = maze.cell_id(*target_pos)
+        neighbor_start, neighbor_cells = maze.neighbor_start, maze.neighbor_cells
+        width, height = maze.width, maze.height
+                # Heap xếp (chi phí, x, y) như bản gốc: rank = x * height + y. Thay cho việc so sánh cả
+        # đường đi khi trùng khóa, parent giữ ô cha cho đường (x, y) nhỏ nhất trong số cùng chi phí
+        pq = [(0, start % width * height + start // width, start)]
+        scratch = maze.search_scratch()
+        generation = scratch.begin()
+        stamp, parent, best, closed = scratch.side(0)  # Ô đã chốt khi closed == generation
+        stamp[start] = generation
+        parent[start] = start
+        best[start] = 0
         expanded_nodes = 0
 
         while pq:
-            cost, (x, y), path = heapq.heappop(pq)
+            cost, _, current = heapq.heappop(pq)
             expanded_nodes += 1
-            if (x, y) == target_pos:
-                return {"path": path[1:] if len(path) > 1 else [], "nodes": expanded_nodes}
-                
-            if (x, y) in visited:
+            if closed[current] == generation:
                 continue
-                
-            visited.add((x, y))
-            
-            valid_moves = maze.get_valid_moves(x, y)
-            for nx, ny in valid_moves:
-                if (nx, ny) not in visited:  # Đã sửa: "not in" thay vì "in"
-                    new_cost = cost + 1
-                    heapq.heappush(pq, (new_cost, (nx, ny), path + [(nx, ny)]))
-        print(f"UCS failed to find path for Ghost {self.id} to {target_pos}")
+
+            closed[current] = generation
+            if current == goal:
+                return {"path": self._reconstruct_path(maze, parent, start, goal), "nodes": expanded_nodes}
+
+            new_cost = cost + 1
+            for k in range(neighbor_start[current], neighbor_start[current + 1]):
+                neighbor = neighbor_cells[k]
+                if closed[neighbor] != generation:
+                    if stamp[neighbor] != generation or new_cost < best[neighbor]:
+                        stamp[neighbor] = generation
+                        best[neighbor] = new_cost
+                        parent[neighbor] = current
+                    elif new_cost == best[neighbor] and path_less(maze, parent, current, parent[neighbor]):
+                        parent[neighbor] = current
+                    heapq.heappush(pq, (new_cost, neighbor % width * height + neighbor // width, neighbor))
+        logger.debug("UCS failed to find path for Ghost %s to %s", self.id, target_pos)
         return {"path": [], "nodes": expanded_nodes}
 
     def a_star(self, maze, target_pos):
-        def manhattan_distance(p1, p2):
-            return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
+        width = maze.width
+        tx, ty = target_pos
+        start = maze.cell_id(*self.position)
+        goal = maze.cell_id(tx, ty)
+        neighbor_start, neighbor_cells = maze.neighbor_start, maze.neighbor_cells
+
+        height = maze.height
+                # Khóa heap (f, g, x, y) và cách chọn parent khi trùng khóa giống UCS
+        pq = [(0, 0, start % width * height + start // width, start)]
+        scratch = maze.search_scratch()
+        generation = scratch.begin()
+        stamp, parent, best, closed = scratch.side(0)  # Ô đã chốt khi closed == generation
+        stamp[start] = generation
+        parent[start] = start
+        best[start] = 0
+        expanded_nodes = 0
+
+        while pq:
+            f, g, _, current = heapq.heappop(pq)
+            expanded_nodes += 1
+            if closed[current] == generation:
+                continue
+
+            closed[current] = generation
+            if current == goal:
+                return {"path": self._reconstruct_path(maze, parent, start, goal), "nodes": expanded_nodes}
+
+            new_g = g + 1
+            for k in range(neighbor_start[current], neighbor_start[current + 1]):
+                neighbor = neighbor_cells[k]
+                if closed[neighbor] != generation:
+                    if stamp[neighbor] != generation or new_g < best[neighbor]:
+                        stamp[neighbor] = generation
+                        best[neighbor] = new_g
+                        parent[neighbor] = current
+                    elif new_g == best[neighbor] and path_less(maze, parent, current, parent[neighbor]):
+                        parent[neighbor] = current
+                    # Heuristic Manhattan tính trực tiếp từ id ô
+                    new_h = abs(neighbor % width - tx) + abs(neighbor // width - ty)
+                    heapq.heappush(pq, (new_g + new_h, new_g, neighbor % width * height + neighbor // width,
+                                        neighbor))
+        logger.debug("A* failed to find path for Ghost %s to %s", self.id, target_pos)
+        return {"path": [], "nodes": expanded_nodes}
+
+    def jps(self, maze, target_pos):
+        """
+        Jump Point Search for the 4-connected grid.
+
+        From each expanded cell the search slides straight in every direction
+        and only stops at the target or at a cell with an open side branch
+        (a junction or corner). Cells in between have nothing but the way
+        forward and back, so skipping them keeps A*'s optimal path lengths.
+        """
+        width = maze.width
+        open_dirs = maze.open_dirs
+        tx, ty = target_pos
+        start = maze.cell_id(*self.position)
+        goal = maze.cell_id(tx, ty)
+        # (bit hướng, bước id, mặt nạ hai hướng vuông góc) cho từng hướng của DIRECTIONS
+        moves = [(1 << i, dy * width + dx, 0b1010 if dx == 0 else 0b0101)
+                 for i, (dx, dy) in enumerate(DIRECTIONS)]
 
-        pq = [(0, 0, self.position, [self.position])]
-        visited = set()
+        pq = [(0, 0, start, start)]
+        parent = {}  # jump point -> jump point trước đó
+        best_g = {start: 0}
         expanded_nodes = 0
 
         while pq:
-            f, g, (x, y), path = heapq.heappop(pq)
+            f, g, current, prev = heapq.heappop(pq)
             expanded_nodes += 1
-            if (x, y) == target_pos:
-                return {"path": path[1:] if len(path) > 1 else [], "nodes": expanded_nodes}
-                
-            if (x, y) in visited:
+            if current in parent:
                 continue
-                
-            visited.add((x, y))
-            
-            valid_moves = maze.get_valid_moves(x, y)
-            for nx, ny in valid_moves:
-                if (nx, ny) not in visited:
-                    new_g = g + 1
-                    new_h = manhattan_distance((nx, ny), target_pos)
-                    new_f = new_g + new_h
-                    heapq.heappush(pq, (new_f, new_g, (nx, ny), path + [(nx, ny)]))
-        print(f"A* failed to find path for Ghost {self.id} to {target_pos}")
+
+            parent[current] = prev
+            if current == goal:
+                # Nối lại các đoạn thẳng giữa các jump point thành đường đi từng ô
+                points = [goal]
+                while points[-1] != start:
+                    points.append(parent[points[-1]])
+                points.reverse()
+                path = []
+                for a, b in zip(points, points[1:]):
+                    # Đoạn ngang lệch < width, đoạn dọc lệch bội số của width
+                    step = 1 if abs(b - a) < width else width
+                    if b < a:
+                        step = -step
+                    while a != b:
+                        a += step
+                        path.append(maze.cell_pos(a))
+                return {"path": path, "nodes": expanded_nodes}
+
+            for bit, step, side in moves:
+                # Trượt thẳng cho tới đích hoặc ô có lối rẽ ngang
+                cell, steps = current, 0
+                jump_point = -1
+                while open_dirs[cell] & bit:
+                    cell += step
+                    steps += 1
+                    if cell == goal or open_dirs[cell] & side:
+                        jump_point = cell
+                        break
+                if jump_point < 0 or jump_point in parent:
+                    continue
+                new_g = g + steps
+                if new_g < best_g.get(jump_point, new_g + 1):
+                    best_g[jump_point] = new_g
+                    new_h = abs(jump_point % width - tx) + abs(jump_point // width - ty)
+                    heapq.heappush(pq, (new_g + new_h, new_g, jump_point, current))
+        logger.debug("JPS failed to find path for Ghost %s to %s", self.id, target_pos)
+        return {"path": [], "nodes": expanded_nodes}
+
+    def hierarchical(self, maze, target_pos):
+        # Tìm trên đồ thị junction (vài chục nút) rồi mở rộng ra từng ô
+        result = maze.junction_graph().find_path(self.position, target_pos)
+        if not result["path"] and self.position != target_pos:
+            logger.debug("HPA failed to find path for Ghost %s to %s", self.id, target_pos)
+        return result
+
+    def _join_paths(self, maze, parent_forward, parent_backward, start, meet, goal):
+        # Nửa đầu: start -> meet theo parent_forward; nửa sau: meet -> goal theo parent_backward
+        path = self._reconstruct_path(maze, parent_forward, start, meet)
+        node = meet
+        while node != goal:
+            node = parent_backward[node]
+            path.append(maze.cell_pos(node))
+        return path
+
+    def bidirectional_bfs(self, maze, target_pos):
+        start = maze.cell_id(*self.position)
+        goal = maze.cell_id(*target_pos)
+        if start == goal:
+            return {"path": [], "nodes": 1}
+        neighbor_start, neighbor_cells = maze.neighbor_start, maze.neighbor_cells
+        # (phía ghost, phía Pac-Man); một ô thuộc phía nào khi stamp của phía đó == generation
+        scratch = maze.search_scratch()
+        generation = scratch.begin()
+        stamp, parent, dist = zip(*(scratch.side(i)[:3] for i in (0, 1)))
+        for side, cell in ((0, start), (1, goal)):
+            stamp[side][cell] = generation
+            parent[side][cell] = cell
+            dist[side][cell] = 0
+        frontiers = ([start], [goal])
+        expanded_nodes = 0
+
+        while frontiers[0] and frontiers[1]:
+            # Mở rộng trọn một tầng của phía có frontier nhỏ hơn
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            own_stamp, own_parent, own_dist = stamp[side], parent[side], dist[side]
+            other_stamp, other_dist = stamp[1 - side], dist[1 - side]
+            best, meet = None, -1
+            next_frontier = []
+            for current in frontiers[side]:
+                expanded_nodes += 1
+                d = own_dist[current] + 1
+                for k in range(neighbor_start[current], neighbor_start[current + 1]):
+                    neighbor = neighbor_cells[k]
+                    if own_stamp[neighbor] != generation:
+                        own_stamp[neighbor] = generation
+                        own_parent[neighbor] = current
+                        own_dist[neighbor] = d
+                        next_frontier.append(neighbor)
+                    if other_stamp[neighbor] == generation:
+                        # Hai frontier gặp nhau; giữ điểm gặp tốt nhất của cả tầng này
+                        total = own_dist[neighbor] + other_dist[neighbor]
+                        if best is None or total < best:
+                            best, meet = total, neighbor
+            if best is not None:
+                path = self._join_paths(maze, parent[0], parent[1], start, meet, goal)
+                return {"path": path, "nodes": expanded_nodes}
+            frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+        logger.debug("BI-BFS failed to find path for Ghost %s to %s", self.id, target_pos)
         return {"path": [], "nodes": expanded_nodes}
 
-    def move(self, maze, target_pos):
-        print(f"Ghost {self.id} moving towards {target_pos}, current position: {self.position}")
+    def bidirectional_a_star(self, maze, target_pos):
+        """
+        Bidirectional A*: the ghost-side search uses the Manhattan distance to
+        Pac-Man, the Pac-Man-side search the distance to the ghost. The search
+        stops once the smallest f in either queue reaches the best meeting
+        cost found so far, which keeps the result optimal.
+        """
+        width = maze.width
+        start = maze.cell_id(*self.position)
+        goal = maze.cell_id(*target_pos)
+        if start == goal:
+            return {"path": [], "nodes": 1}
+        neighbor_start, neighbor_cells = maze.neighbor_start, maze.neighbor_cells
+        inf = float('inf')
+        anchors = (goal, start)  # Đích của heuristic cho từng phía
+        # g chỉ hợp lệ khi stamp == generation (ngược lại coi như vô cùng); closed cũng là một dấu thế hệ
+        scratch = maze.search_scratch()
+        generation = scratch.begin()
+        stamp, parent, g, closed = zip(scratch.side(0), scratch.side(1))
+        for side, cell in ((0, start), (1, goal)):
+            stamp[side][cell] = generation
+            parent[side][cell] = cell
+            g[side][cell] = 0
+        h0 = abs(start % width - goal % width) + abs(start // width - goal // width)
+        queues = ([(h0, 0, start)], [(h0, 0, goal)])
+        best, meet = inf, -1
+        expanded_nodes = 0
+
+        while queues[0] and queues[1]:
+            # Bỏ phần tử đã đóng ở đầu mỗi heap trước khi so sánh
+            for side in (0, 1):
+                queue = queues[side]
+                while queue and closed[side][queue[0][2]] == generation:
+                    heapq.heappop(queue)
+            if not queues[0] or not queues[1]:
+                break
+            if queues[0][0][0] >= best or queues[1][0][0] >= best:
+                break
+            side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+            own_stamp, own_g = stamp[side], g[side]
+            other_stamp, other_g = stamp[1 - side], g[1 - side]
+            ax, ay = anchors[side] % width, anchors[side] // width
+            f, cost, current = heapq.heappop(queues[side])
+            closed[side][current] = generation
+            expanded_nodes += 1
+            new_g = cost + 1
+            for k in range(neighbor_start[current], neighbor_start[current + 1]):
+                neighbor = neighbor_cells[k]
+                if own_stamp[neighbor] != generation or new_g < own_g[neighbor]:
+                    own_stamp[neighbor] = generation
+                    own_g[neighbor] = new_g
+                    parent[side][neighbor] = current
+                    closed[side][neighbor] = 0
+                    new_h = abs(neighbor % width - ax) + abs(neighbor // width - ay)
+                    heapq.heappush(queues[side], (new_g + new_h, new_g, neighbor))
+                    if other_stamp[neighbor] == generation and new_g + other_g[neighbor] < best:
+                        best, meet = new_g + other_g[neighbor], neighbor
+
+        if meet < 0:
+            logger.debug("BI-A* failed to find path for Ghost %s to %s", self.id, target_pos)
+            return {"path": [], "nodes": expanded_nodes}
+        path = self._join_paths(maze, parent[0], parent[1], start, meet, goal)
+        return {"path": path, "nodes": expanded_nodes}
+
+    def _new_resumable(self, maze, target_pos):
+        if self.algorithm == 'BFS':
+            return BudgetedBFS(maze, self.position, target_pos)
+        if self.algorithm == 'DFS':
+            return BudgetedDFS(maze, self.position, target_pos, DFS_MAX_PATH_LENGTH)
+        if self.algorithm == 'UCS':
+            return BudgetedAStar(maze, self.position, target_pos, weight=0)
+        if self.algorithm == 'A*':
+            return BudgetedAStar(maze, self.position, target_pos)
+        return AnytimeAStar(maze, self.position, target_pos)
+
+    def budgeted_search(self, maze, target_pos):
+        """
+        Run this ghost's resumable search for one call's node/time budget.
+
+        A search with no solution yet is carried over to the next call even
+        if Pac-Man or the ghost moved meanwhile, so a slow search still
+        finishes; the ghost keeps its previous path until then. Once a
+        path exists (ARA* improving it), a new start or target restarts
+        the search. Results are marked "partial" until the search is done.
+        """
+        search = self.resumable
+        if search is not None and search.maze is not maze:
+            search = None
+        if search is not None and search.path is not None and (
+                search.target_pos != target_pos or search.start_pos != self.position):
+            search = None
+        if search is None:
+            search = self.resumable = self._new_resumable(maze, target_pos)
+
+        expanded_nodes = search.run(self.node_budget, self.time_budget_us)
+        if search.done:
+            self.resumable = None
+
+        if search.path is None:
+            # Chưa có lời giải: đi tiếp theo đường cũ
+            return {"path": list(self.path), "nodes": expanded_nodes, "partial": True}
+        path = search.path
+        if self.position != search.start_pos:
+            # Ghost đã đi tiếp trong lúc tìm kiếm: cắt phần đã đi qua, hoặc bỏ nếu đã rời đường
+            if self.position not in path:
+                self.resumable = None
+                self.last_target = None
+                return {"path": list(self.path), "nodes": expanded_nodes, "partial": True}
+            path = path[path.index(self.position) + 1:]
+        self.last_target = search.target_pos
+        if not path and self.position != search.target_pos:
+            logger.debug("%s failed to find path for Ghost %s to %s", self.algorithm, self.id, target_pos)
+        return {"path": list(path), "nodes": expanded_nodes,
+                "partial": not search.done or search.target_pos != target_pos}
+
+    def table_lookup(self, maze, target_pos):
+        # Tra bảng next-hop đã tính sẵn trong Maze, không cần mở rộng nút nào
+        path = maze.table_path(self.position, target_pos)
+        if not path and self.position != target_pos:
+            logger.debug("TABLE failed to find path for Ghost %s to %s", self.id, target_pos)
+        # Mỗi bước đi là một lần đọc bảng
+        return {"path": path, "nodes": len(path)}
+
+    def d_star_lite(self, maze, target_pos):
+        # Giữ cây tìm kiếm (gốc tại ghost) giữa các frame: Pac-Man đổi ô chỉ đổi đích, ghost đi thì giữ cây con
+        if self.dstar is None or self.dstar.maze is not maze:
+            self.dstar = DStarLite(maze, self.position, target_pos)
+            expanded_nodes = self.dstar.compute_shortest_path()
+        else:
+            expanded_nodes = self.dstar.update(self.position, target_pos)
+        path = self.dstar.path()
+        if not path and self.position != target_pos:
+            logger.debug("D*LITE failed to find path for Ghost %s to %s", self.id, target_pos)
+        return {"path": path, "nodes": expanded_nodes}
+
+    def field_descent(self, maze, target_pos):
+        # Đi xuống trường khoảng cách chung; chỉ ghost đầu tiên sau khi Pac-Man đổi ô phải chạy BFS
+        if self.planner is None:
+            self.planner = SharedPlanner()
+        result = self.planner.path(maze, self.position, target_pos)
+        if not result["path"] and self.position != target_pos:
+            logger.debug("FIELD failed to find path for Ghost %s to %s", self.id, target_pos)
+        return result
+
+    def frighten(self):
+        """Chuyển sang chế độ hoảng sợ (ghost đang quay về nhà thì không đổi)."""
+        if self.mode == EATEN:
+            return
+        self.mode = FRIGHTENED
+        self.path = self.path[:1] if self.move_progress > 0 else []  # Đi nốt ô đang dở rồi mới bỏ chạy
+        self.last_target = None
+        self.resumable = None
+
+    def calm(self):
+        """Hết thời gian hoảng sợ: quay lại đuổi theo Pac-Man."""
+        if self.mode == FRIGHTENED:
+            self.mode = CHASE
+            self.path = self.path[:1] if self.move_progress > 0 else []
+
+    def flee_step(self, maze, planner, pacman_pos):
+        """
+        Pick the next cell of a frightened ghost from the shared flee map.
+
+        No search runs per ghost: on a cell with no pending step, the ghost
+        moves to the neighbor with the lowest flee value, or stays if it is
+        already at a local minimum.
+
+        Returns:
+            int: Nodes the planner expanded to refresh the flee map (0 if
+            another ghost already paid for it this Pac-Man cell).
+        """
+        if self.path:
+            return 0
+        flee, expanded_nodes = planner.flee_field(maze, pacman_pos)
+        cell = maze.cell_id(*self.position)
+        best, best_value = None, flee[cell]
+        for neighbor in maze.neighbors(cell):
+            if flee[neighbor] < best_value:
+                best, best_value = neighbor, flee[neighbor]
+        if best is not None:
+            self.path = [maze.cell_pos(best)]
+        return expanded_nodes
+
+    def send_home(self, maze, planner):
+        """
+        Eaten by Pac-Man: run back to the ghost house down the planner's
+        shared home field (one BFS per maze, no search per ghost).
+
+        Returns:
+            int: Nodes the planner expanded to build the home field (0 once
+            it exists for this maze).
+        """
+        self.mode = EATEN
+        self.speed = EATEN_SPEED
+        self.move_progress = 0.0
+        self.pixel_position = (
+            self.position[0] * self.cell_size + self.cell_size // 2,
+            self.position[1] * self.cell_size + self.cell_size // 2
+        )
+        # Nhà là mọi ô xuất phát của ghost trên maze (chính ô của ghost nếu maze không ghi)
+        homes = tuple(maze.ghosts.values()) or (self.start_pos,)
+        home, expanded_nodes = planner.home_field(maze, homes)
+        cell = maze.cell_id(*self.position)
+        path = []
+        while home[cell] > 0:
+            d = home[cell] - 1
+            cell = next(n for n in maze.neighbors(cell) if home[n] == d)
+            path.append(maze.cell_pos(cell))
+        self.path = path
+        self.last_target = None
+        self.resumable = None
+        return expanded_nodes
+
+    def revive(self):
+        """Đã về tới nhà: tiếp tục đuổi theo Pac-Man."""
+        self.mode = CHASE
+        self.speed = GHOST_SPEED
+        self.path = []
+        self.last_target = None
+
+    def move(self, maze, target_pos, plan=True):
+        logger.debug("Ghost %s moving towards %s, current position: %s", self.id, target_pos, self.position)
         
-        # Chỉ gọi find_path nếu cần
-        if not self.path or self.last_target != target_pos:
+        # Chỉ gọi find_path nếu cần (plan=False: đường đi do AsyncPlanner cung cấp, chỉ đi theo;
+        # tìm kiếm đang dở được find_path của frame sau chạy tiếp)
+        if plan and self.resumable is None and (not self.path or self.last_target != target_pos):
             metrics = self.find_path(maze, target_pos)
         else:
             # Đường đi vẫn còn hiệu lực, không cần tìm lại
             # Sử dụng metrics từ lần cuối cùng
-            if self.metrics_history:
+            if self.last_metrics:
                 metrics = {
                     "path": self.path,
-                    "time": self.metrics_history[-1]["time"],
-                    "memory": self.metrics_history[-1]["memory"],
-                    "nodes": self.metrics_history[-1]["nodes"],
+                    "time": self.last_metrics["time"],
+                    "memory": self.last_metrics["memory"],
+                    "nodes": self.last_metrics["nodes"],
                     "reused": True
                 }
             else:
                 metrics = {"path": self.path, "time": 0, "memory": 0, "nodes": 0, "reused": True}
-            print(f"Ghost {self.id} using existing path: {self.path}")
+            logger.debug("Ghost %s using existing path: %s", self.id, self.path)
 
         if not self.path:
-            print(f"No path available for Ghost {self.id}")
+            logger.debug("No path available for Ghost %s", self.id)
             return
 
         self.move_progress += self.speed
@@ -268,16 +749,26 @@ class Ghost:
                 self.position[0] * self.cell_size + self.cell_size // 2,
                 self.position[1] * self.cell_size + self.cell_size // 2
             )
-            print(f"Ghost {self.id} moved to new position: {self.position}")
+            logger.debug("Ghost %s moved to new position: %s", self.id, self.position)
         
-        # In metric sau mỗi bước di chuyển
-        print(f"Metrics after move - Time: {metrics['time']:.6f}s, Memory: {metrics['memory']:.2f}KB, Nodes: {metrics['nodes']}")
-        if metrics.get("reused"):
-            print(f"Path reused")
-            if len(self.metrics_history) > 0:
-                print(f"Latest metrics history: {self.metrics_history[-1]}")
-        else:
-            print(f"Latest metrics history: {self.metrics_history[-1]}")
+        # In metric sau mỗi bước di chuyển (chỉ khi bật DEBUG cho module ghost)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Metrics after move - Time: %.6fs, Memory: %.2fKB, Nodes: %d%s",
+                         metrics['time'], metrics['memory'], metrics['nodes'],
+                         " (path reused)" if metrics.get("reused") else "")
+            if self.metrics.records:
+                logger.debug("Latest metrics history: %s", self.metrics.records[-1])
+
+    def snapshot(self):
+        """Trạng thái di chuyển bất biến (tuple); cây D* Lite và cache không cần sao lưu."""
+        return (self.position, self.pixel_position, tuple(self.path), self.move_progress,
+                self.previous_position, self.last_target, self.mode, self.speed)
+
+    def restore(self, state):
+        (self.position, self.pixel_position, path, self.move_progress,
+         self.previous_position, self.last_target, self.mode, self.speed) = state
+        self.path = list(path)
+        self.resumable = None  # Tìm kiếm dở dang thuộc về nhánh khác
 
     def reset(self):
         self.position = self.start_pos
@@ -289,5 +780,8 @@ class Ghost:
         self.move_progress = 0.0
         self.previous_position = None
         self.last_target = None
-        self.metrics_history = []
-        print(f"Ghost {self.id} reset to start position: {self.start_pos}")
\ No newline at end of file
+        self.last_metrics = None
+        self.resumable = None
+        self.mode = CHASE
+        self.speed = GHOST_SPEED
+        logger.info("Ghost %s reset to start position: %s", self.id, self.start_pos)
\ No newline at end of file
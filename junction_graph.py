@@ -0,0 +1,181 @@
+"""
+Corridor (junction) graph abstraction of a Maze for hierarchical search.
+
+Nodes are junctions: walkable cells whose number of open neighbors is not
+two (intersections and dead ends). Edges are the corridors between them,
+weighted by their length and keeping their interior cells. A query
+attaches start and goal to the graph through the corridor they lie on,
+runs A* over the few dozen junctions and expands the result back into
+cells, so its cost depends on the junction count rather than the cells.
+"""
+import heapq
+
+
+class JunctionGraph:
+    def __init__(self, maze):
+        """Build the graph from maze's CSR neighbor table (ghost passability)."""
+        self.maze = maze
+        self.junctions = set()
+        self.edges = []       # (a, b, ô bên trong từ a đến b)
+        self.adjacency = {}   # junction -> [(junction kề, độ dài, edge id, đi xuôi a->b)]
+        self.edge_of = {}     # ô trong hành lang -> (edge id, chỉ số trong edge)
+        self._build()
+
+    def _degree(self, cell):
+        maze = self.maze
+        return maze.neighbor_start[cell + 1] - maze.neighbor_start[cell]
+
+    def _build(self):
+        maze = self.maze
+        passable = [c for c in range(maze.size) if maze.ghost_pass[c]]
+        # Xác định toàn bộ junction trước rồi mới đi dọc các hành lang
+        self.junctions.update(c for c in passable if self._degree(c) != 2)
+        for cell in sorted(self.junctions):
+            self._add_junction(cell)
+        # Vòng kín không có ngã rẽ: chọn một ô bất kỳ làm junction
+        for cell in passable:
+            if cell not in self.junctions and cell not in self.edge_of:
+                self._add_junction(cell)
+
+    def _add_junction(self, junction):
+        self.junctions.add(junction)
+        self.adjacency.setdefault(junction, [])
+        for first in self.maze.neighbors(junction):
+            if first in self.edge_of:
+                continue  # Hành lang đã được đi từ đầu kia
+            if first in self.junctions:
+                # Hai junction kề nhau: cạnh độ dài 1 không có ô bên trong
+                if not any(k == first and not self.edges[e][2]
+                           for k, _, e, _ in self.adjacency[junction]):
+                    self._add_edge(junction, first, [])
+                continue
+            interior = []
+            prev, cell = junction, first
+            while cell not in self.junctions:
+                interior.append(cell)
+                following = [n for n in self.maze.neighbors(cell) if n != prev]
+                if not following:
+                    break
+                prev, cell = cell, following[0]
+                if cell == first:
+                    break  # Vòng kín quay lại chính nó
+            if cell not in self.junctions:
+                cell = junction
+            self._add_edge(junction, cell, interior)
+
+    def _add_edge(self, a, b, interior):
+        edge_id = len(self.edges)
+        self.edges.append((a, b, interior))
+        for i, cell in enumerate(interior):
+            self.edge_of[cell] = (edge_id, i)
+        length = len(interior) + 1
+        self.adjacency.setdefault(a, []).append((b, length, edge_id, True))
+        self.adjacency.setdefault(b, []).append((a, length, edge_id, False))
+
+    def _access(self, cell):
+        """
+        Junctions reachable from cell without crossing another junction.
+
+        Returns:
+            dict: {junction: (cost, cells from cell to the junction, excluding
+            cell, including the junction)}.
+        """
+        if cell in self.junctions:
+            return {cell: (0, [])}
+        edge_id, i = self.edge_of[cell]
+        a, b, interior = self.edges[edge_id]
+        toward_a = interior[i - 1::-1] + [a] if i > 0 else [a]
+        toward_b = interior[i + 1:] + [b]
+        access = {a: (len(toward_a), toward_a)}
+        if b not in access or len(toward_b) < access[b][0]:
+            access[b] = (len(toward_b), toward_b)
+        return access
+
+    def _corridor(self, junction, edge_id, forward):
+        """Ô đi qua khi theo edge từ junction (không gồm junction, gồm junction cuối)."""
+        a, b, interior = self.edges[edge_id]
+        return interior + [b] if forward else interior[::-1] + [a]
+
+    def find_path(self, start_pos, goal_pos):
+        """
+        Hierarchical path query.
+
+        Returns:
+            dict: {"path": cells after start up to goal, "nodes": junctions
+            expanded}.
+        """
+        maze = self.maze
+        width = maze.width
+        start = maze.cell_id(*start_pos)
+        goal = maze.cell_id(*goal_pos)
+        if start == goal:
+            return {"path": [], "nodes": 0}
+        if start not in self.junctions and start not in self.edge_of:
+            return {"path": [], "nodes": 0}
+        if goal not in self.junctions and goal not in self.edge_of:
+            return {"path": [], "nodes": 0}
+
+        gx, gy = goal_pos
+        best_cost, best = float('inf'), None
+        # Start và goal cùng một hành lang: đi thẳng trên hành lang đó
+        if start in self.edge_of and goal in self.edge_of:
+            (es, i), (eg, j) = self.edge_of[start], self.edge_of[goal]
+            if es == eg:
+                interior = self.edges[es][2]
+                best_cost = abs(i - j)
+                best = ('direct', interior[i + 1:j + 1] if j > i else interior[j:i][::-1])
+
+        # Chi phí từ junction tới goal (đảo ngược đường từ goal ra junction)
+        goal_access = {}
+        for junction, (cost, cells) in self._access(goal).items():
+            goal_access[junction] = (cost, cells[-2::-1] + [goal] if cells else [])
+
+        g_score = {}
+        came_from = {}  # junction -> (junction trước hoặc None, các ô đi qua)
+        pq = []
+        for junction, (cost, cells) in self._access(start).items():
+            if cost < g_score.get(junction, float('inf')):
+                g_score[junction] = cost
+                came_from[junction] = (None, cells)
+                h = abs(junction % width - gx) + abs(junction // width - gy)
+                heapq.heappush(pq, (cost + h, cost, junction))
+
+        closed = set()
+        expanded_nodes = 0
+        while pq:
+            f, g, junction = heapq.heappop(pq)
+            if f >= best_cost:
+                break
+            if junction in closed:
+                continue
+            closed.add(junction)
+            expanded_nodes += 1
+            if junction in goal_access:
+                cost = g + goal_access[junction][0]
+                if cost < best_cost:
+                    best_cost, best = cost, ('graph', junction)
+            for neighbor, length, edge_id, forward in self.adjacency[junction]:
+                new_g = g + length
+                if neighbor not in closed and new_g < g_score.get(neighbor, float('inf')):
+                    g_score[neighbor] = new_g
+                    came_from[neighbor] = (junction, (junction, edge_id, forward))
+                    h = abs(neighbor % width - gx) + abs(neighbor // width - gy)
+                    heapq.heappush(pq, (new_g + h, new_g, neighbor))
+
+        if best is None:
+            return {"path": [], "nodes": expanded_nodes}
+        if best[0] == 'direct':
+            cells = best[1]
+        else:
+            # Mở rộng chuỗi junction thành các ô
+            segments = [goal_access[best[1]][1]]
+            junction = best[1]
+            while True:
+                prev, step = came_from[junction]
+                if prev is None:
+                    segments.append(step)
+                    break
+                segments.append(self._corridor(*step))
+                junction = prev
+            cells = [cell for segment in reversed(segments) for cell in segment]
+        return {"path": [maze.cell_pos(cell) for cell in cells], "nodes": expanded_nodes}
@@ -0,0 +1,69 @@
+"""
+Leveled, per-module logging configuration.
+
+Every module logs through ``logging.getLogger(__name__)`` (``ghost``,
+``simulation``, ``main``, ...). The global level and per-module overrides
+come from arguments or from the PACMAN_LOG environment variable, e.g.
+
+    PACMAN_LOG=warning                  # default: quiet play
+    PACMAN_LOG=info,ghost=debug         # path dumps for ghosts only
+    PACMAN_LOG=debug,simulation=off     # everything except the engine
+"""
+import logging
+import os
+
+DEFAULT_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+# 'off' tắt hẳn một module
+_OFF = logging.CRITICAL + 1
+
+
+def _parse_level(name):
+    name = name.strip().upper()
+    if name == 'OFF':
+        return _OFF
+    level = logging.getLevelName(name)
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level: {name}")
+    return level
+
+
+def parse_spec(spec):
+    """
+    Parse a "level,module=level,..." string.
+
+    Returns:
+        tuple: (global level or None, {module: level}).
+    """
+    level = None
+    modules = {}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        if '=' in part:
+            module, module_level = part.split('=', 1)
+            modules[module.strip()] = _parse_level(module_level)
+        else:
+            level = _parse_level(part)
+    return level, modules
+
+
+def configure_logging(level=None, module_levels=None, fmt=DEFAULT_FORMAT):
+    """
+    Configure the root handler and per-module levels.
+
+    Args:
+        level (str | int, optional): Global level; falls back to PACMAN_LOG,
+            then WARNING.
+        module_levels (dict, optional): {module name: level}; merged over
+            the modules listed in PACMAN_LOG.
+    """
+    env_level, modules = parse_spec(os.environ.get('PACMAN_LOG', ''))
+    if isinstance(level, str):
+        level = _parse_level(level)
+    if level is None:
+        level = env_level if env_level is not None else logging.WARNING
+    for module, module_level in (module_levels or {}).items():
+        modules[module] = _parse_level(module_level) if isinstance(module_level, str) else module_level
+
+    logging.basicConfig(format=fmt, level=level, force=True)
+    for module, module_level in modules.items():
+        logging.getLogger(module).setLevel(module_level)
@@ -0,0 +1,115 @@
+"""
+Lookahead Pac-Man agent built on Simulation.snapshot()/restore().
+
+At every cell boundary the agent searches a tree of Pac-Man turns: each
+branch restores the state, feeds one direction and steps the engine until
+Pac-Man reaches its next cell, so the real ghost algorithms (and their
+path cache) answer every branch. Ghosts are deterministic functions of
+the game state, so their chance nodes have a single outcome and the
+expectimax reduces to a depth-limited max over Pac-Man's turns; leaves
+are scored by points gained, lives lost, a win, and the distance to the
+nearest remaining dot.
+
+Usage:
+    sim = Simulation(6, metrics='off')
+    sim.run(5000, controller=LookaheadAgent(depth=4))
+"""
+import logging
+
+from maze import DIRECTIONS
+from metrics import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+
+class LookaheadAgent:
+    def __init__(self, depth=4, death_penalty=1000.0, win_bonus=5000.0, dot_weight=1.0,
+                 max_ticks_per_turn=40):
+        """
+        Args:
+            depth (int): Pac-Man turns (cells) searched ahead.
+            death_penalty (float): Value lost per life lost in a branch.
+            win_bonus (float): Value of clearing the board.
+            dot_weight (float): Cost per cell of Manhattan distance to the
+                nearest dot at a leaf, so the agent heads for food beyond
+                the horizon.
+            max_ticks_per_turn (int): Safety cap on ticks simulated per turn.
+        """
+        self.depth = depth
+        self.death_penalty = death_penalty
+        self.win_bonus = win_bonus
+        self.dot_weight = dot_weight
+        self.max_ticks_per_turn = max_ticks_per_turn
+        self.branches = 0       # Số nhánh (restore + mô phỏng) của lần quyết định gần nhất
+        self.total_branches = 0
+        self.decisions = 0
+        self._quiet = MetricsCollector('off')
+
+    def __call__(self, sim):
+        """Controller for Simulation.run(): the direction for the next tick."""
+        # Chỉ Level 6 nhận điều khiển; chỉ quyết định khi Pac-Man vừa tới một ô
+        if sim.current_level != 6 or sim.pacman.move_progress != 0.0 or sim.finished:
+            return (0, 0)
+        if sim.async_planner is not None:
+            raise ValueError("Lookahead needs synchronous ghost planning")
+
+        # Tắt recorder và metrics trong lúc tìm kiếm để các nhánh không bị ghi lại
+        recorder, sim.recorder = sim.recorder, None
+        collectors = [ghost.metrics for ghost in sim.ghosts]
+        for ghost in sim.ghosts:
+            ghost.metrics = self._quiet
+        self.branches = 0
+        root = sim.snapshot()
+        root_score, root_lives = sim.pacman.score, sim.pacman.lives
+        best_direction, best_value = (0, 0), None
+        try:
+            for direction in self._options(sim):
+                value = self._branch(sim, root, direction, self.depth, root_score, root_lives)
+                if best_value is None or value > best_value:
+                    best_direction, best_value = direction, value
+        finally:
+            sim.restore(root)
+            for ghost, collector in zip(sim.ghosts, collectors):
+                ghost.metrics = collector
+            sim.recorder = recorder
+        self.decisions += 1
+        self.total_branches += self.branches
+        logger.debug("Lookahead chose %s (value %.1f, %d branches)", best_direction, best_value or 0.0,
+                     self.branches)
+        return best_direction
+
+    def _options(self, sim):
+        x, y = sim.pacman.position
+        maze = sim.maze
+        return [(dx, dy) for dx, dy in DIRECTIONS
+                if 0 <= x + dx < maze.width and 0 <= y + dy < maze.height
+                and not maze.is_blocked_for_pacman(x + dx, y + dy)]
+
+    def _branch(self, sim, state, direction, depth, root_score, root_lives):
+        sim.restore(state)
+        self.branches += 1
+        self._advance(sim, direction)
+        if depth <= 1 or sim.finished or sim.pacman.lives < root_lives:
+            return self._evaluate(sim, root_score, root_lives)
+        child = sim.snapshot()
+        return max(self._branch(sim, child, option, depth - 1, root_score, root_lives)
+                   for option in self._options(sim))
+
+    def _advance(self, sim, direction):
+        """Mô phỏng đến khi Pac-Man tới ô kế tiếp (hoặc game kết thúc / mất mạng)."""
+        lives = sim.pacman.lives
+        sim.step(direction)
+        for _ in range(self.max_ticks_per_turn):
+            if sim.finished or sim.pacman.lives != lives or sim.pacman.move_progress == 0.0:
+                return
+            sim.step((0, 0))
+
+    def _evaluate(self, sim, root_score, root_lives):
+        value = sim.pacman.score - root_score
+        value -= self.death_penalty * (root_lives - sim.pacman.lives)
+        if sim.game_won:
+            value += self.win_bonus
+        elif sim.maze.dots:
+            x, y = sim.pacman.position
+            value -= self.dot_weight * min(abs(x - dx) + abs(y - dy) for dx, dy in sim.maze.dots)
+        return value
@@ -1,17 +1,17 @@
+import argparse
+import logging
 import pygame
 import sys
-from maze import Maze
-from ghost import Ghost
-from pacman import PacMan
+import time
+from simulation import Simulation, FixedTimestep, CELL_SIZE
+from ghost import FRIGHTENED, EATEN
+from replay import Recorder
+from logging_setup import configure_logging
+
+logger = logging.getLogger(__name__)
 
-# Initialize Pygame
-pygame.init()
-CELL_SIZE = 20
 SCREEN_WIDTH = 30 * CELL_SIZE  # 30 cells wide
 SCREEN_HEIGHT = 33 * CELL_SIZE  # 33 cells tall to match maze height
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Pac-Man AI Project")
-clock = pygame.time.Clock()
 
 # Colors
 BLACK = (0, 0, 0)
@@ -23,86 +23,130 @@ ORANGE = (255, 165, 0)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 
+GHOST_COLORS = {'B': BLUE, 'P': PINK, 'O': ORANGE, 'R': RED}
+FRIGHTENED_COLOR = (40, 40, 160)  # Ghost hoảng sợ (xanh đậm, khác màu ghost B)
+
+FPS = 60
+MIN_SPEED, MAX_SPEED = 0.25, 64.0  # Giới hạn hệ số tua nhanh
+SKIP_RENDER_BUDGET = 1.0 / FPS  # Thời gian thực dành cho mô phỏng mỗi vòng khi bỏ qua render
+SKIP_RENDER_BATCH = 64  # Số tick chạy giữa hai lần kiểm tra deadline
+SKIP_RENDER_INTERVAL = 0.5  # Khi bỏ qua render, vẫn vẽ lại màn hình mỗi 0.5s
+
 class Game:
-    def __init__(self):
-        self.maze = Maze()
-        self.pacman = PacMan(self.maze.pacman_pos, CELL_SIZE)
-        self.ghosts = []  # Sẽ được khởi tạo dựa trên cấp độ
+    """Pygame front-end: input and rendering over a headless Simulation."""
+
+    def __init__(self, speed=1.0, skip_render=False, async_planning=None, node_budget=None,
+                 time_budget_us=None, record=None, autopilot=False):
+        """
+        Args:
+            speed (float): Fast-forward multiplier for the fixed-timestep loop.
+            skip_render (bool): Simulate as fast as possible and only refresh
+                the screen every SKIP_RENDER_INTERVAL seconds.
+            async_planning (str, optional): 'thread' or 'process' to plan
+                ghost paths off the render loop.
+            node_budget (int, optional): Nodes each ghost search may expand
+                per tick before resuming on the next one.
+            time_budget_us (float, optional): Same, in microseconds.
+            record (str, optional): Write a replay log of the session here.
+            autopilot (bool): Let Pac-Man chase the nearest dot in levels 1-5.
+        """
+        # Initialize Pygame (chỉ khi thực sự mở cửa sổ)
+        pygame.init()
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Pac-Man AI Project")
+        self.clock = pygame.time.Clock()
+        self.sim = Simulation(cell_size=CELL_SIZE, async_planning=async_planning,
+                              node_budget=node_budget, time_budget_us=time_budget_us,
+                              recorder=Recorder(record) if record else None, autopilot=autopilot)
         self.running = True
-        self.game_over = False
-        self.game_won = False
-        self.player_moved = False
         self.level_selection = True  # Trạng thái chọn cấp độ
         self.quit_confirmation = False  # Trạng thái xác nhận thoát
-        self.current_level = 0  # Cấp độ hiện tại (1-6)
         self.font = pygame.font.SysFont('Arial', 24)
         self.level_font = pygame.font.SysFont('Arial', 30)
+        self.direction = (0, 0)  # Hướng người chơi nhấn trong frame hiện tại
+        self.timestep = FixedTimestep(speed=speed)
+        self.skip_render = skip_render
+        self._next_draw = 0.0
+        # Bộ nhớ đệm cho renderer
+        self._text_cache = {}
+        self._background = None
+        self._background_maze = None
+        self._screen_state = None
+        self._sprite_rects = []
+        self._ui = []
+
+    @property
+    def maze(self):
+        return self.sim.maze
+
+    @property
+    def pacman(self):
+        return self.sim.pacman
+
+    @property
+    def ghosts(self):
+        return self.sim.ghosts
+
+    @property
+    def current_level(self):
+        return self.sim.current_level
+
+    @current_level.setter
+    def current_level(self, level):
+        self.sim.current_level = level
+
+    @property
+    def game_over(self):
+        return self.sim.game_over
+
+    @property
+    def game_won(self):
+        return self.sim.game_won
 
     def initialize_level(self):
         """Khởi tạo cấp độ dựa trên current_level."""
-        self.maze = Maze()
-        self.pacman = PacMan(self.maze.pacman_pos, CELL_SIZE)
-        self.ghosts = []
-        self.player_moved = False
-        self.game_over = False
-        self.game_won = False
+        self.sim.initialize_level()
         self.quit_confirmation = False  # Đặt lại trạng thái xác nhận thoát
 
-        if self.current_level == 1:
-            self.ghosts = [Ghost('B', self.maze.ghosts['B'], 'BFS', CELL_SIZE)]
-        elif self.current_level == 2:
-            self.ghosts = [Ghost('P', self.maze.ghosts['P'], 'DFS', CELL_SIZE)]
-        elif self.current_level == 3:
-            self.ghosts = [Ghost('O', self.maze.ghosts['O'], 'UCS', CELL_SIZE)]
-        elif self.current_level == 4:
-            self.ghosts = [Ghost('R', self.maze.ghosts['R'], 'A*', CELL_SIZE)]
-        elif self.current_level in [5, 6]:
-            self.ghosts = [
-                Ghost('B', self.maze.ghosts['B'], 'BFS', CELL_SIZE),
-                Ghost('P', self.maze.ghosts['P'], 'DFS', CELL_SIZE),
-                Ghost('O', self.maze.ghosts['O'], 'UCS', CELL_SIZE),
-                Ghost('R', self.maze.ghosts['R'], 'A*', CELL_SIZE)
-            ]
-
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
 
             if event.type == pygame.KEYDOWN:
-                print(f"Key pressed: {event.key}")  # Log để gỡ lỗi
+                logger.debug("Key pressed: %s", event.key)  # Log để gỡ lỗi
                 if self.level_selection:
                     # Hỗ trợ cả phím số chính và numpad
                     if event.key in (pygame.K_1, pygame.K_KP1):
                         self.current_level = 1
                         self.level_selection = False
                         self.initialize_level()
-                        print("Selected Level 1")
+                        logger.info("Selected Level 1")
                     elif event.key in (pygame.K_2, pygame.K_KP2):
                         self.current_level = 2
                         self.level_selection = False
                         self.initialize_level()
-                        print("Selected Level 2")
+                        logger.info("Selected Level 2")
                     elif event.key in (pygame.K_3, pygame.K_KP3):
                         self.current_level = 3
                         self.level_selection = False
                         self.initialize_level()
-                        print("Selected Level 3")
+                        logger.info("Selected Level 3")
                     elif event.key in (pygame.K_4, pygame.K_KP4):
                         self.current_level = 4
                         self.level_selection = False
                         self.initialize_level()
-                        print("Selected Level 4")
+                        logger.info("Selected Level 4")
                     elif event.key in (pygame.K_5, pygame.K_KP5):
                         self.current_level = 5
                         self.level_selection = False
                         self.initialize_level()
-                        print("Selected Level 5")
+                        logger.info("Selected Level 5")
                     elif event.key in (pygame.K_6, pygame.K_KP6):
                         self.current_level = 6
                         self.level_selection = False
                         self.initialize_level()
-                        print("Selected Level 6")
+                        logger.info("Selected Level 6")
 
                 elif self.quit_confirmation:
                     # Xử lý xác nhận thoát
@@ -122,66 +166,139 @@ class Game:
                     # Khi đang chơi, nhấn Q để hiển thị màn hình xác nhận thoát
                     if event.key == pygame.K_q:
                         self.quit_confirmation = True
+                    # +/- đổi hệ số tua nhanh, Tab bật/tắt chế độ bỏ qua render
+                    elif event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                        self.timestep.speed = min(MAX_SPEED, self.timestep.speed * 2)
+                        logger.info("Speed x%g", self.timestep.speed)
+                    elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                        self.timestep.speed = max(MIN_SPEED, self.timestep.speed / 2)
+                        logger.info("Speed x%g", self.timestep.speed)
+                    elif event.key == pygame.K_TAB:
+                        self.skip_render = not self.skip_render
+                        logger.info("Skip rendering: %s", self.skip_render)
 
         # Điều khiển Pac-Man (chỉ ở Level 6, và không trong trạng thái xác nhận thoát)
+        self.direction = (0, 0)
         if not self.level_selection and not self.game_over and not self.game_won and not self.quit_confirmation:
             if self.current_level == 6:  # Chỉ Level 6 cho phép điều khiển Pac-Man
                 keys = pygame.key.get_pressed()
-                new_direction = (0, 0)
                 if keys[pygame.K_RIGHT]:
-                    new_direction = (1, 0)
+                    self.direction = (1, 0)
                 elif keys[pygame.K_LEFT]:
-                    new_direction = (-1, 0)
+                    self.direction = (-1, 0)
                 elif keys[pygame.K_UP]:
-                    new_direction = (0, -1)
+                    self.direction = (0, -1)
                 elif keys[pygame.K_DOWN]:
-                    new_direction = (0, 1)
-                if new_direction != (0, 0):
-                    self.player_moved = True
-                self.pacman.move(self.maze, new_direction)
+                    self.direction = (0, 1)
+
+    def update(self, frame_seconds):
+        """
+        Advance the simulation by the fixed ticks owed for this frame.
 
-    def update(self):
-        if self.level_selection or self.game_over or self.game_won or self.quit_confirmation:
+        Args:
+            frame_seconds (float): Wall time since the previous frame.
+        """
+        if self.level_selection or self.quit_confirmation:
+            self.timestep.reset()  # Không dồn thời gian khi đang tạm dừng
             return
+        if self.skip_render:
+            # Không vẽ: chạy mô phỏng hết tốc lực trong một khoảng thời gian thực
+            deadline = time.perf_counter() + SKIP_RENDER_BUDGET
+            while not self.sim.finished and time.perf_counter() < deadline:
+                self.sim.run(SKIP_RENDER_BATCH, self.direction)
+            return
+        self.sim.run(self.timestep.advance(frame_seconds), self.direction)
+
+    def _text(self, slot, text, font, color):
+        """Surface chữ cho một vị trí UI; chỉ render lại khi nội dung đổi."""
+        cached = self._text_cache.get(slot)
+        if cached is None or cached[0] != text:
+            cached = (text, font.render(text, True, color))
+            self._text_cache[slot] = cached
+        return cached[1]
 
-    # Update ghosts only if player has moved (or in level 1-5, ghosts move immediately)
-        if self.current_level in [1, 2, 3, 4, 5] or self.player_moved:
-            for ghost in self.ghosts:
-                # Gọi find_path để thu thập metrics và sau đó di chuyển ghost
-                metrics = ghost.find_path(self.maze, self.pacman.position)
-                ghost.move(self.maze, self.pacman.position)
-                print(f"Ghost {ghost.id} metrics: Time={metrics['time']:.6f}s, Memory={metrics['memory']:.2f}KB, Nodes={metrics['nodes']}")
+    def _build_background(self):
+        """Vẽ sẵn tường, cửa và các chấm còn lại vào một surface tĩnh."""
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        background.fill(BLACK)
+        for y in range(len(self.maze.board)):
+            for x in range(len(self.maze.board[0])):
+                rect = pygame.Rect(x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE)
+                self._draw_cell(background, rect, self.maze.board[y][x])
+        self._background = background
+        self._background_maze = self.maze
+        self.maze.track_changes().clear()  # Nền vừa vẽ đã gồm mọi thay đổi trước đó
+
+    @staticmethod
+    def _draw_cell(surface, rect, cell):
+        surface.fill(BLACK, rect)
+        if cell == 1:  # Dot
+            pygame.draw.circle(surface, WHITE, rect.center, 3)
+        elif cell == 2:  # Big dot
+            pygame.draw.circle(surface, WHITE, rect.center, 6)
+        elif cell in [3,4,5,6,7,8]:  # Walls
+            pygame.draw.rect(surface, BLUE, rect)
+        elif cell == 9:  # Gate
+            pygame.draw.rect(surface, WHITE, rect)
 
-    # Check collisions with ghosts
+    def _redraw_changed_cells(self):
+        """Vẽ lại trên nền các ô maze đã đổi (chấm bị ăn); trả về các vùng cần cập nhật."""
+        changed = self.maze.track_changes()
+        rects = []
+        for x, y in changed:
+            rect = pygame.Rect(x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE)
+            self._draw_cell(self._background, rect, self.maze.board[y][x])
+            rects.append(rect)
+        changed.clear()  # Đã vẽ xong: bỏ khỏi nhật ký để nó không phình ra
+        return rects
+
+    def _draw_sprites(self):
+        """Vẽ Pac-Man và ghost, trả về danh sách vùng đã vẽ."""
+        rects = [pygame.draw.circle(self.screen, YELLOW,
+                                    (int(self.pacman.pixel_position[0]),
+                                     int(self.pacman.pixel_position[1])),
+                                    CELL_SIZE//2)]
         for ghost in self.ghosts:
-            if ghost.position == self.pacman.position:
-                self.pacman.lives -= 1
-                if self.pacman.lives <= 0:
-                    self.game_over = True
-                else:
-                    # Reset Pac-Man and ghosts
-                    self.pacman.reset(self.maze.pacman_pos)
-                    for ghost in self.ghosts:
-                        ghost.reset()
-                    self.player_moved = False
-                break
-
-    # Check win condition (no dots or power pellets left) - Only for Level 6
-        if self.current_level == 6:
-            dots_remaining = any(
-                cell in [1, 2]
-                for row in self.maze.board
-                for cell in row
-            )
-            if not dots_remaining:
-                self.game_won = True
+            color, radius = GHOST_COLORS[ghost.id], CELL_SIZE//2
+            if ghost.mode == FRIGHTENED:
+                color = FRIGHTENED_COLOR
+            elif ghost.mode == EATEN:
+                color, radius = WHITE, CELL_SIZE//4  # Chỉ còn "đôi mắt" chạy về nhà
+            rects.append(pygame.draw.circle(self.screen, color,
+                                            (int(ghost.pixel_position[0]),
+                                             int(ghost.pixel_position[1])),
+                                            radius))
+        return rects
+
+    def _draw_ui(self):
+        """Vẽ điểm/mạng/cấp độ; trả về [(surface, rect)] của từng dòng chữ."""
+        score_text = self._text("score", f"Score: {self.pacman.score}", self.font, WHITE)
+        lives_text = self._text("lives", f"Lives: {self.pacman.lives}", self.font, WHITE)
+        if self.skip_render:
+            speed = "  >>"
+        else:
+            speed = "" if self.timestep.speed == 1 else f"  x{self.timestep.speed:g}"
+        level_text = self._text("level", f"Level: {self.current_level}{speed}", self.font, WHITE)
+        return [
+            (score_text, score_text.get_rect(topleft=(10, 10))),
+            (lives_text, lives_text.get_rect(topleft=(SCREEN_WIDTH-150, 10))),
+            (level_text, level_text.get_rect(topleft=(SCREEN_WIDTH//2 - level_text.get_width()//2, 10))),
+        ]
+
     def draw(self):
-        screen.fill(BLACK)
+        # Chỉ vẽ lại toàn màn hình khi trạng thái màn hình thay đổi
+        state = (self.level_selection, self.quit_confirmation, self.game_over,
+                 self.game_won, self.current_level, self.maze)
+        full_redraw = state != self._screen_state
+        self._screen_state = state
 
         if self.level_selection:
+            if not full_redraw:
+                return
             # Hiển thị màn hình chọn cấp độ
+            self.screen.fill(BLACK)
             title_text = self.level_font.render("Select Level", True, WHITE)
-            screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 50))
+            self.screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 50))
 
             level_texts = [
                 self.font.render("1 - Blue Ghost (BFS)", True, WHITE),
@@ -192,53 +309,51 @@ class Game:
                 self.font.render("6 - User-Controlled Pac-Man", True, WHITE)
             ]
             for i, text in enumerate(level_texts):
-                screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 150 + i*50))
+                self.screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 150 + i*50))
             pygame.display.flip()
             return
 
-        # Draw maze
-        for y in range(len(self.maze.board)):
-            for x in range(len(self.maze.board[0])):
-                rect = pygame.Rect(x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                cell = self.maze.board[y][x]
-
-                if cell == 1:  # Dot
-                    pygame.draw.circle(screen, WHITE, rect.center, 3)
-                elif cell == 2:  # Big dot
-                    pygame.draw.circle(screen, WHITE, rect.center, 6)
-                elif cell in [3,4,5,6,7,8]:  # Walls
-                    pygame.draw.rect(screen, BLUE, rect)
-                elif cell == 9:  # Gate
-                    pygame.draw.rect(screen, WHITE, rect)
-
-        # Draw Pac-Man
-        pygame.draw.circle(screen, YELLOW,
-                           (int(self.pacman.pixel_position[0]),
-                            int(self.pacman.pixel_position[1])),
-                           CELL_SIZE//2)
-
-        # Draw Ghosts
-        ghost_colors = {'B': BLUE, 'P': PINK, 'O': ORANGE, 'R': RED}
-        for ghost in self.ghosts:
-            pygame.draw.circle(screen, ghost_colors[ghost.id],
-                               (int(ghost.pixel_position[0]),
-                                int(ghost.pixel_position[1])),
-                               CELL_SIZE//2)
-
-        # Draw UI
-        score_text = self.font.render(f"Score: {self.pacman.score}", True, WHITE)
-        lives_text = self.font.render(f"Lives: {self.pacman.lives}", True, WHITE)
-        level_text = self.font.render(f"Level: {self.current_level}", True, WHITE)
-        screen.blit(score_text, (10, 10))
-        screen.blit(lives_text, (SCREEN_WIDTH-150, 10))
-        screen.blit(level_text, (SCREEN_WIDTH//2 - level_text.get_width()//2, 10))
+        if self._background_maze is not self.maze:
+            self._build_background()
+
+        # Các màn hình phủ (thoát/thua/thắng) tĩnh: vẽ một lần khi vào trạng thái
+        overlay = self.quit_confirmation or self.game_over or self.game_won
+        if overlay and not full_redraw:
+            return
+
+        if full_redraw:
+            self._redraw_changed_cells()
+            self.screen.blit(self._background, (0, 0))
+            self._sprite_rects = self._draw_sprites()
+            self._ui = self._draw_ui()
+            for surface, rect in self._ui:
+                self.screen.blit(surface, rect)
+        else:
+            # Dirty rectangles: xóa sprite cũ bằng nền, vẽ lại sprite và chữ đã đổi
+            dirty = list(self._sprite_rects)
+            dirty.extend(self._redraw_changed_cells())
+            for rect in dirty:
+                self.screen.blit(self._background, rect, rect)
+            ui = self._draw_ui()
+            for (old_surface, old_rect), (surface, rect) in zip(self._ui, ui):
+                if surface is not old_surface:
+                    self.screen.blit(self._background, old_rect, old_rect)
+                    dirty.extend((old_rect, rect))
+            self._ui = ui
+            self._sprite_rects = self._draw_sprites()
+            dirty.extend(self._sprite_rects)
+            for surface, rect in self._ui:
+                if rect.collidelist(dirty) >= 0:
+                    self.screen.blit(surface, rect)
+            pygame.display.update(dirty)
+            return
 
         # Draw Quit Confirmation screen
         if self.quit_confirmation:
             quit_text = self.font.render("Are you sure you want to quit?", True, WHITE)
             confirm_text = self.font.render("Press Y to Quit, N to Resume", True, WHITE)
-            screen.blit(quit_text, (SCREEN_WIDTH//2 - quit_text.get_width()//2, SCREEN_HEIGHT//2 - 20))
-            screen.blit(confirm_text, (SCREEN_WIDTH//2 - confirm_text.get_width()//2, SCREEN_HEIGHT//2 + 20))
+            self.screen.blit(quit_text, (SCREEN_WIDTH//2 - quit_text.get_width()//2, SCREEN_HEIGHT//2 - 20))
+            self.screen.blit(confirm_text, (SCREEN_WIDTH//2 - confirm_text.get_width()//2, SCREEN_HEIGHT//2 + 20))
             pygame.display.flip()
             return
 
@@ -246,27 +361,52 @@ class Game:
         if self.game_over:
             game_over_text = self.font.render("GAME OVER", True, RED)
             restart_text = self.font.render("Press R to Select Level, Q to Quit", True, WHITE)
-            screen.blit(game_over_text, (SCREEN_WIDTH//2-80, SCREEN_HEIGHT//2))
-            screen.blit(restart_text, (SCREEN_WIDTH//2-140, SCREEN_HEIGHT//2+30))
+            self.screen.blit(game_over_text, (SCREEN_WIDTH//2-80, SCREEN_HEIGHT//2))
+            self.screen.blit(restart_text, (SCREEN_WIDTH//2-140, SCREEN_HEIGHT//2+30))
 
         # Draw Win screen (chỉ ở Level 6)
         if self.game_won:
             win_text = self.font.render("YOU WIN!", True, GREEN)
             restart_text = self.font.render("Press R to Select Level, Q to Quit", True, WHITE)
-            screen.blit(win_text, (SCREEN_WIDTH//2-60, SCREEN_HEIGHT//2))
-            screen.blit(restart_text, (SCREEN_WIDTH//2-140, SCREEN_HEIGHT//2+30))
+            self.screen.blit(win_text, (SCREEN_WIDTH//2-60, SCREEN_HEIGHT//2))
+            self.screen.blit(restart_text, (SCREEN_WIDTH//2-140, SCREEN_HEIGHT//2+30))
 
         pygame.display.flip()
 
     def run(self):
         while self.running:
+            # Bỏ giới hạn FPS khi không render để mô phỏng nhanh nhất có thể
+            frame_seconds = self.clock.tick(0 if self.skip_render else FPS) / 1000.0
             self.handle_events()
-            self.update()
+            self.update(frame_seconds)
+            if self.skip_render and not (self.level_selection or self.quit_confirmation or self.sim.finished):
+                now = time.perf_counter()
+                if now < self._next_draw:
+                    continue
+                self._next_draw = now + SKIP_RENDER_INTERVAL
             self.draw()
-            clock.tick(60)  # 60 FPS
+        self.sim.close()
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Pac-Man AI Project")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="fast-forward multiplier for game time (default: 1)")
+    parser.add_argument("--no-render", action="store_true",
+                        help="simulate as fast as possible, refreshing the screen twice a second")
+    parser.add_argument("--async-planning", choices=("thread", "process"),
+                        help="run ghost searches in a background pool instead of the game loop")
+    parser.add_argument("--node-budget", type=int,
+                        help="nodes a ghost search may expand per tick (resumes next tick)")
+    parser.add_argument("--time-budget-us", type=float,
+                        help="microseconds a ghost search may run per tick (resumes next tick)")
+    parser.add_argument("--record", metavar="PATH", help="record the session to a replay log")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="Pac-Man eats the nearest dots by itself in levels 1-5")
+    args = parser.parse_args()
+    configure_logging()
+    game = Game(speed=min(MAX_SPEED, max(MIN_SPEED, args.speed)), skip_render=args.no_render,
+                async_planning=args.async_planning, node_budget=args.node_budget,
+                time_budget_us=args.time_budget_us, record=args.record, autopilot=args.autopilot)
     game.run()
\ No newline at end of file
@@ -1,27 +1,289 @@
 import copy
+import collections
+import itertools
+import threading
+from array import array
+
+WALL_CELLS = (3, 4, 5, 6, 7, 8)
+GATE_CELL = 9
+DOT_CELLS = (1, 2)  # Chấm thường và power pellet
+
+# Thứ tự hướng dùng cho bảng láng giềng (giống get_valid_moves trước đây)
+DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+# Thứ tự BFS/DFS mở rộng láng giềng như bản gốc (lên, phải, xuống, trái), khác thứ tự bảng láng giềng
+SEARCH_ORDER = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+# Bảng cho bytes.translate: giá trị ô -> 1/0, dựng mặt nạ cả lưới ở tốc độ C
+GHOST_PASS_TABLE = bytes(0 if v in WALL_CELLS else 1 for v in range(256))
+PACMAN_PASS_TABLE = bytes(0 if v in WALL_CELLS or v == GATE_CELL else 1 for v in range(256))
+DOT_TABLE = bytes(1 if v in DOT_CELLS else 0 for v in range(256))
+# Số hướng mở của một giá trị open_dirs
+POPCOUNT_TABLE = bytes(bin(v).count('1') for v in range(256))
+
+# Vị trí xuất phát trên board mặc định
+DEFAULT_PACMAN_POS = (14, 24)
+DEFAULT_GHOSTS = {
+    'B': (13, 14),  # Blue Ghost
+    'P': (14, 14),  # Pink Ghost
+    'O': (15, 14),  # Orange Ghost
+    'R': (16, 14)   # Red Ghost
+}
+
+
+class SearchScratch:
+    """
+    Per-cell lists reused by every search one thread runs on a maze.
+
+    Filling size-long lists for each query made even a one-step search
+    O(board). begin() starts a new generation instead: an entry of cell c
+    only counts while ``stamp[c] == generation``, so whatever earlier
+    searches left behind is ignored without being cleared.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.generation = 0
+        self._sides = []
+
+    def begin(self):
+        """Start a new search; returns its generation number."""
+        self.generation += 1
+        return self.generation
+
+    def side(self, i=0):
+        """
+        Lists for search direction i (bidirectional searches use 0 and 1).
+
+        Returns:
+            tuple: (stamp, parent, value, mark); parent and value are only
+            valid where stamp equals the generation, and mark is a second
+            stamp (e.g. "closed in this generation").
+        """
+        while len(self._sides) <= i:
+            size = self.size
+            self._sides.append(([0] * size, [0] * size, [0] * size, [0] * size))
+        return self._sides[i]
+
 
 class Maze:
-    def __init__(self):
-        self.board = copy.deepcopy(boards)
-        self.width = len(boards[0])
-        self.height = len(boards)
-        self.pacman_pos = (14, 24)
-        self.ghosts = {
-            'B': (13, 14),  # Blue Ghost
-            'P': (14, 14),  # Pink Ghost
-            'O': (15, 14),  # Orange Ghost
-            'R': (16, 14)   # Red Ghost
-        }
+    def __init__(self, board=None, pacman_pos=None, ghosts=None, grid=None, width=None):
+        """
+        Args:
+            board (list, optional): Rows of cell values; defaults to a copy of
+                the built-in ``boards``. Use maze_io to load or generate one.
+            pacman_pos (tuple, optional): Pac-Man start (x, y); stays None for
+                a board given without one (enough for path searches, but a
+                Simulation needs a start).
+            ghosts (dict, optional): Ghost id -> start (x, y).
+            grid (bytes, optional): Row-major cell bytes given instead of
+                board (e.g. straight from a binary maze file); needs width.
+            width (int, optional): Row length of grid.
+        """
+        if grid is not None:
+            # Lưới byte có sẵn: các hàng của board cắt thẳng từ lưới, không duyệt từng ô
+            self.grid = bytearray(grid)
+            board = [list(self.grid[start:start + width]) for start in range(0, len(self.grid), width)]
+        elif board is None:
+            board = copy.deepcopy(boards)
+            pacman_pos = pacman_pos or DEFAULT_PACMAN_POS
+            ghosts = ghosts or DEFAULT_GHOSTS
+        self.board = board
+        self.width = len(board[0])
+        self.height = len(board)
+        self.pacman_pos = tuple(pacman_pos) if pacman_pos is not None else None
+        self.ghosts = dict(ghosts or {})
+        # Lưới phẳng: ô (x, y) có id = y * width + x
+        self.size = self.width * self.height
+        if grid is None:
+            self.grid = bytearray(b"".join(map(bytes, board)))
+        self._build_passability()
+        # Tập các ô còn chấm/power pellet, cập nhật qua set_cell
+        width = self.width
+        self.dots = {(c % width, c // width)
+                     for c in itertools.compress(range(self.size), self.grid.translate(DOT_TABLE))}
+        self.changed_cells = None  # Nhật ký các ô đã đổi, chỉ bật khi renderer gọi track_changes()
+        self._undo = []  # (id ô, giá trị cũ, số thứ tự sửa) cho snapshot/restore
+        self._edits = 0
+        # Bảng khoảng cách/bước kế tiếp giữa mọi cặp ô, xây dựng khi cần
+        self._apsp_cells = None
+        self._apsp_index = None
+        self._apsp_dist = None
+        self._apsp_next = None
+        self._junction_graph = None
+        self._origin = None  # Maze được copy ra bản này: bảng dựng chậm được dựng trên đó để dùng chung
+        self._scratch = {}  # thread id -> SearchScratch, dùng chung với các bản copy
+
+    def __getstate__(self):
+        # Bộ đệm tìm kiếm thuộc về thread của process này, không gửi sang process worker
+        state = self.__dict__.copy()
+        state['_scratch'] = {}
+        state['_origin'] = None
+        return state
+
+    def _build_passability(self):
+        """
+        Precompute passability masks and the CSR neighbor table from ``grid``.
+
+        ``ghost_pass`` / ``pacman_pass`` hold 1 for open cells (ghosts may
+        cross the gate, Pac-Man may not). Ghost neighbors of cell ``c`` are
+        ``neighbor_cells[neighbor_start[c]:neighbor_start[c + 1]]``, and bit i
+        of ``open_dirs[c]`` is set when the step DIRECTIONS[i] is open.
+        """
+        grid, size = self.grid, self.size
+        self.ghost_pass = grid.translate(GHOST_PASS_TABLE)
+        self.pacman_pass = grid.translate(PACMAN_PASS_TABLE)
+
+        # Mặt nạ từng hướng = ghost_pass dịch theo bước của hướng, bỏ các bước ra ngoài biên;
+        # các phép AND/OR trên cả lưới làm bằng số nguyên lớn, không duyệt từng ô bằng Python
+        width, height = self.width, self.height
+        ghost_bits = int.from_bytes(self.ghost_pass, 'little')
+        not_last_column = int.from_bytes((b"\x01" * (width - 1) + b"\x00") * height, 'little')
+        not_first_column = int.from_bytes((b"\x00" + b"\x01" * (width - 1)) * height, 'little')
+        steps = [dy * width + dx for dx, dy in DIRECTIONS]
+        open_bits = 0
+        selector = bytearray(4 * size)
+        targets = array('i', bytes(16 * size))
+        # ids -width .. size + width - 1: targets của một hướng là một lát cắt liên tục
+        cell_ids = array('i', range(-width, size + width))
+        for i, ((dx, dy), step) in enumerate(zip(DIRECTIONS, steps)):
+            # Bit của ô c nằm ở byte c; láng giềng c + step nằm ở byte c + step
+            mask = ghost_bits >> (8 * step) if step > 0 else ghost_bits << (-8 * step)
+            if dx > 0:
+                mask &= not_last_column
+            elif dx < 0:
+                mask &= not_first_column
+            mask = mask.to_bytes(size + abs(step), 'little')[:size]
+            open_bits |= int.from_bytes(mask, 'little') << i
+            # Xen kẽ 4 hướng theo từng ô để compress giữ thứ tự DIRECTIONS trong mỗi ô
+            selector[i::4] = mask
+            targets[i::4] = cell_ids[width + step:width + step + size]
+        open_dirs = bytearray(open_bits.to_bytes(size, 'little'))
+        neighbor_cells = array('i', itertools.compress(targets, selector))
+        neighbor_start = array('i', itertools.accumulate(open_dirs.translate(POPCOUNT_TABLE), initial=0))
+        self.neighbor_start = neighbor_start
+        self.neighbor_cells = neighbor_cells
+        self.open_dirs = open_dirs
+        # Dấu vân tay của độ thông qua: đổi khi tường/cửa đổi, giống nhau giữa các Maze cùng bố cục
+        self.version = hash((width, bytes(self.ghost_pass)))
+
+    def cell_id(self, x, y):
+        return y * self.width + x
+
+    def cell_pos(self, cell):
+        return (cell % self.width, cell // self.width)
+
+    def neighbors(self, cell):
+        """Id các ô láng giềng ghost đi được từ ô cell."""
+        return self.neighbor_cells[self.neighbor_start[cell]:self.neighbor_start[cell + 1]]
+
+    def search_scratch(self):
+        """
+        Reusable search buffers of the calling thread (see SearchScratch).
+
+        Copies share them: a thread runs one search at a time, and every
+        search starts a new generation.
+        """
+        ident = threading.get_ident()
+        scratch = self._scratch.get(ident)
+        if scratch is None:
+            scratch = self._scratch[ident] = SearchScratch(self.size)
+        return scratch
+
+    def track_changes(self):
+        """
+        Start logging written cells for a renderer that redraws them.
+
+        The log is off by default, so headless runs and snapshot/restore
+        do not grow it without bound; the reader clears what it has drawn.
+
+        Returns:
+            list: The log, one (x, y) per write, oldest first.
+        """
+        if self.changed_cells is None:
+            self.changed_cells = []
+        return self.changed_cells
+
+    def copy(self):
+        """
+        A new maze with this maze's current cells and start positions.
+
+        Passability, the neighbor table, the all-pairs tables and the
+        junction graph are only ever replaced, never mutated, so the copy
+        shares whatever the source has built; only the cells, the dot set
+        and the logs are duplicated. Tables the copy needs later are built
+        on the source (while both still have the same walls), so every
+        copy of one layout builds them once between them.
+        """
+        clone = Maze.__new__(Maze)
+        clone.__dict__.update(self.__dict__)
+        origin = self._origin
+        clone._origin = origin if origin is not None and origin.neighbor_cells is self.neighbor_cells else self
+        clone.board = [row[:] for row in self.board]
+        clone.grid = bytearray(self.grid)
+        clone.dots = set(self.dots)
+        clone.ghosts = dict(self.ghosts)
+        clone.changed_cells = None
+        clone._undo = []
+        clone._edits = 0
+        return clone
+
+    def snapshot(self):
+        """
+        O(1) marker of the current cells for restore().
+
+        Returns:
+            tuple: (undo log length, serial of its last edit).
+        """
+        return (len(self._undo), self._undo[-1][2] if self._undo else 0)
+
+    def restore(self, mark):
+        """
+        Undo every set_cell since snapshot() returned mark, in O(changed cells).
+
+        Raises:
+            ValueError: If mark was taken on a branch that has been undone.
+        """
+        length, serial = mark
+        undo = self._undo
+        if length > len(undo) or (length and undo[length - 1][2] != serial):
+            raise ValueError("Snapshot does not belong to this maze's current history")
+        while len(undo) > length:
+            c, old, _ = undo.pop()
+            self._write(c % self.width, c // self.width, old)
+
+    def set_cell(self, x, y, value):
+        """Ghi giá trị ô vào cả board và grid; tính lại bảng láng giềng nếu tường thay đổi."""
+        c = y * self.width + x
+        self._edits += 1
+        self._undo.append((c, self.grid[c], self._edits))
+        self._write(x, y, value)
+
+    def _write(self, x, y, value):
+        c = y * self.width + x
+        old = self.grid[c]
+        self.board[y][x] = value
+        self.grid[c] = value
+        if self.changed_cells is not None:
+            self.changed_cells.append((x, y))
+        if value in DOT_CELLS:
+            self.dots.add((x, y))
+        elif old in DOT_CELLS:
+            self.dots.discard((x, y))
+        if (old in WALL_CELLS) != (value in WALL_CELLS) or (old == GATE_CELL) != (value == GATE_CELL):
+            self._build_passability()
+            self._apsp_cells = None
+            self._apsp_index = None
+            self._apsp_dist = None
+            self._apsp_next = None
+            self._junction_graph = None
 
     def is_wall(self, x, y):
         """Kiểm tra ô có phải tường không (dùng cho ghost)."""
-        cell = self.board[y][x]
-        return cell in [3, 4, 5, 6, 7, 8]  # Chỉ kiểm tra tường, không bao gồm cửa
+        return not self.ghost_pass[y * self.width + x]  # Chỉ kiểm tra tường, không bao gồm cửa
 
     def is_blocked_for_pacman(self, x, y):
         """Kiểm tra ô có bị chặn đối với Pac-Man không (bao gồm cả cửa)."""
-        cell = self.board[y][x]
-        return cell in [3, 4, 5, 6, 7, 8, 9]  # Bao gồm cả tường và cửa
+        return not self.pacman_pass[y * self.width + x]  # Bao gồm cả tường và cửa
 
     def is_dot(self, x, y):
         return self.board[y][x] == 1
@@ -29,18 +291,240 @@ class Maze:
     def is_power_pellet(self, x, y):
         return self.board[y][x] == 2
 
+    @property
+    def dots_remaining(self):
+        """Số chấm và power pellet còn lại (O(1))."""
+        return len(self.dots)
+
+    def eat(self, x, y):
+        """
+        Remove the dot or power pellet at (x, y), if any.
+
+        Returns:
+            int: The eaten cell value (1 dot, 2 power pellet) or 0 if empty.
+        """
+        if (x, y) not in self.dots:
+            return 0
+        cell = self.board[y][x]
+        self.set_cell(x, y, 0)
+        return cell
+
     def get_valid_moves(self, x, y):
         """Dùng cho ghost: cho phép đi qua cửa (cell == 9)."""
-        moves = []
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < self.width and 0 <= ny < self.height:
-                if not self.is_wall(nx, ny):  # Ghost có thể đi qua cửa (cell == 9)
-                    moves.append((nx, ny))
-        return moves
+        width = self.width
+        c = y * width + x
+        return [(n % width, n // width)
+                for n in self.neighbor_cells[self.neighbor_start[c]:self.neighbor_start[c + 1]]]
+
     def is_valid_position(self, x, y):
         return 0 <= x < self.width and 0 <= y < self.height
+
+    def _shared_origin(self):
+        """Maze gốc của bản copy nếu hai bên còn cùng bảng láng giềng (cùng tường), ngược lại None."""
+        origin = self._origin
+        if origin is not None and origin.neighbor_cells is self.neighbor_cells:
+            return origin
+        return None
+
+    def junction_graph(self):
+        """Đồ thị junction/hành lang của maze, xây một lần và dùng lại (chung với maze gốc)."""
+        if self._junction_graph is None:
+            origin = self._shared_origin()
+            if origin is not None:
+                self._junction_graph = origin.junction_graph()
+            else:
+                from junction_graph import JunctionGraph
+                self._junction_graph = JunctionGraph(self)
+        return self._junction_graph
+
+    def build_distance_table(self):
+        """
+        Build the all-pairs distance and next-hop tables over ghost-walkable cells.
+
+        Walls never change during a game (eating dots only turns 1/2 into 0),
+        so one BFS per cell is enough for the whole session. Both tables are
+        flat arrays of size n*n indexed by ``src * n + dst``; unreachable
+        pairs hold -1.
+        """
+        if self._apsp_dist is not None:
+            return
+        origin = self._shared_origin()
+        if origin is not None:
+            # Dựng trên maze gốc để các bản copy khác (cấp độ sau) dùng lại
+            origin.build_distance_table()
+            self._apsp_cells, self._apsp_index = origin._apsp_cells, origin._apsp_index
+            self._apsp_dist, self._apsp_next = origin._apsp_dist, origin._apsp_next
+            return
+
+        ids = [c for c in range(self.size) if self.ghost_pass[c]]
+        compact = {c: i for i, c in enumerate(ids)}
+        cells = [self.cell_pos(c) for c in ids]
+        index = {cell: i for i, cell in enumerate(cells)}
+        n = len(cells)
+        neighbors = [[compact[m] for m in self.neighbors(c)] for c in ids]
+
+        typecode = 'h' if n < 32767 else 'i'
+        dist = array(typecode, [-1]) * (n * n)
+        next_hop = array(typecode, [-1]) * (n * n)
+        for target in range(n):
+            # BFS ngược từ target: ô cha của mỗi ô chính là bước kế tiếp về phía target
+            dist[target * n + target] = 0
+            next_hop[target * n + target] = target
+            queue = collections.deque([target])
+            while queue:
+                current = queue.popleft()
+                d = dist[current * n + target] + 1
+                for neighbor in neighbors[current]:
+                    k = neighbor * n + target
+                    if dist[k] < 0:
+                        dist[k] = d
+                        next_hop[k] = current
+                        queue.append(neighbor)
+
+        self._apsp_cells = cells
+        self._apsp_index = index
+        self._apsp_dist = dist
+        self._apsp_next = next_hop
+
+    def distance_table(self):
+        """
+        The all-pairs tables in compact form, for batched lookups.
+
+        Returns:
+            tuple: (cells, dist, next_hop) where cells lists the (x, y) of
+            each compact index and dist / next_hop are flat arrays indexed
+            by ``src * len(cells) + dst`` holding steps and compact indices.
+        """
+        self.build_distance_table()
+        return self._apsp_cells, self._apsp_dist, self._apsp_next
+
+    def distance(self, start, target):
+        """Khoảng cách ngắn nhất (số bước) giữa hai ô, -1 nếu không tới được."""
+        self.build_distance_table()
+        i = self._apsp_index.get(start)
+        j = self._apsp_index.get(target)
+        if i is None or j is None:
+            return -1
+        return self._apsp_dist[i * len(self._apsp_cells) + j]
+
+    def next_hop(self, start, target):
+        """Ô kế tiếp trên đường ngắn nhất từ start đến target, None nếu không có."""
+        self.build_distance_table()
+        i = self._apsp_index.get(start)
+        j = self._apsp_index.get(target)
+        if i is None or j is None:
+            return None
+        hop = self._apsp_next[i * len(self._apsp_cells) + j]
+        return self._apsp_cells[hop] if hop >= 0 else None
+
+    def _goal_search(self, start, goals, pacman, avoid, first_only):
+        """
+        One BFS from start that stops at the first goal (first_only) or once
+        every goal is settled.
+
+        Returns:
+            tuple: (found, parent, nodes) where found maps goal cell id ->
+            steps in BFS order and parent is the BFS tree, valid for the
+            cells it reaches until the thread's next search.
+        """
+        width, height = self.width, self.height
+        start_cell = start[1] * width + start[0]
+        remaining = {y * width + x for x, y in goals
+                     if 0 <= x < width and 0 <= y < height}
+        # Ô đã thăm khi stamp == generation: không cấp phát mảng cỡ bàn cho mỗi lần gọi
+        scratch = self.search_scratch()
+        generation = scratch.begin()
+        stamp, parent, _, _ = scratch.side(0)
+        stamp[start_cell] = generation
+        parent[start_cell] = start_cell
+        for x, y in avoid:
+            if 0 <= x < width and 0 <= y < height and (x, y) != start:
+                stamp[y * width + x] = generation  # Đánh dấu như đã thăm để BFS không đi qua
+        passable = self.pacman_pass if pacman else self.ghost_pass
+        neighbor_start, neighbor_cells = self.neighbor_start, self.neighbor_cells
+        found = {}
+        frontier = [start_cell]
+        steps = nodes = 0
+        while frontier and remaining:
+            next_frontier = []
+            for current in frontier:
+                nodes += 1
+                if current in remaining:
+                    found[current] = steps
+                    remaining.discard(current)
+                    if first_only or not remaining:
+                        return found, parent, nodes
+                for k in range(neighbor_start[current], neighbor_start[current + 1]):
+                    neighbor = neighbor_cells[k]
+                    if stamp[neighbor] != generation and passable[neighbor]:
+                        stamp[neighbor] = generation
+                        parent[neighbor] = current
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+            steps += 1
+        return found, parent, nodes
+
+    def nearest_goal(self, start, goals, pacman=True, avoid=()):
+        """
+        Nearest of several goals, found with a single BFS.
+
+        Args:
+            start (tuple): Start cell (x, y).
+            goals (iterable): Goal cells (x, y), e.g. ``self.dots``.
+            pacman (bool): Use Pac-Man passability (the gate is closed);
+                False uses the ghosts'.
+            avoid (iterable): Cells the path must not enter (e.g. ghosts).
+
+        Returns:
+            tuple: (goal, path, nodes) with path the cells after start up
+            to and including goal; (None, [], nodes) if no goal is reachable.
+        """
+        found, parent, nodes = self._goal_search(start, goals, pacman, avoid, True)
+        if not found:
+            return None, [], nodes
+        goal_cell = next(iter(found))
+        start_cell = self.cell_id(*start)
+        path = []
+        cell = goal_cell
+        while cell != start_cell:
+            path.append(self.cell_pos(cell))
+            cell = parent[cell]
+        path.reverse()
+        return self.cell_pos(goal_cell), path, nodes
+
+    def goal_distances(self, start, goals, pacman=True, avoid=()):
+        """
+        Shortest distances from start to every goal, in a single BFS that
+        stops as soon as the last reachable goal is settled.
+
+        Returns:
+            dict: Goal (x, y) -> steps, for reachable goals only, nearest first.
+        """
+        found, _, _ = self._goal_search(start, goals, pacman, avoid, False)
+        return {self.cell_pos(cell): steps for cell, steps in found.items()}
+
+    def table_path(self, start, target):
+        """
+        Walk the next-hop table from start to target.
+
+        Returns:
+            list: Cells after start up to and including target, [] if
+            unreachable or start == target.
+        """
+        self.build_distance_table()
+        i = self._apsp_index.get(start)
+        j = self._apsp_index.get(target)
+        if i is None or j is None:
+            return []
+        n = len(self._apsp_cells)
+        if self._apsp_dist[i * n + j] < 0:
+            return []
+        path = []
+        while i != j:
+            i = self._apsp_next[i * n + j]
+            path.append(self._apsp_cells[i])
+        return path
+
 # Định nghĩa boards (giữ nguyên)
 boards = [
     [6, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 5],
@@ -0,0 +1,151 @@
+"""
+Pluggable metrics collection for ghost path planning.
+
+A MetricsCollector is shared by every ghost of a run and chooses how much
+each find_path call is measured:
+
+    'off'      no measurement at all, zeros are reported
+    'timing'   wall time with perf_counter_ns only (default for play)
+    'sampled'  timing, plus tracemalloc around every N-th call
+    'full'     timing and tracemalloc peak for every call (benchmarks)
+
+Records are kept in a fixed-capacity ring buffer; running totals per
+algorithm survive eviction so long sessions use constant memory. Named
+counters (e.g. the shared path cache's hits/misses/evictions) sit next to
+the records.
+"""
+import collections
+import time
+import tracemalloc
+
+MODES = ('off', 'timing', 'sampled', 'full')
+
+
+class MetricsCollector:
+    def __init__(self, mode='timing', sample_every=100, capacity=1000):
+        """
+        Args:
+            mode (str): One of MODES.
+            sample_every (int): Memory tracing period for the 'sampled' mode.
+            capacity (int): Number of most recent records kept.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown metrics mode: {mode}")
+        self.mode = mode
+        self.sample_every = max(1, sample_every)
+        self.records = collections.deque(maxlen=capacity)
+        self.totals = {}  # algorithm -> tổng tích lũy, không bị giới hạn bởi capacity
+        self.calls = 0
+        self.counters = collections.Counter()  # Bộ đếm theo tên, vd. path_cache.hit
+        self._owns_tracing = False
+
+    def begin(self):
+        """
+        Start measuring one planning call.
+
+        Returns:
+            tuple: Opaque token to pass to end().
+        """
+        self.calls += 1
+        if self.mode == 'off':
+            return (0, False, 0)
+        traced = self.mode == 'full' or (
+            self.mode == 'sampled' and self.calls % self.sample_every == 0)
+        baseline = 0
+        if traced:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            else:
+                tracemalloc.start()
+                self._owns_tracing = True
+        return (time.perf_counter_ns(), traced, baseline)
+
+    def end(self, token):
+        """
+        Finish the measurement started by begin().
+
+        Returns:
+            tuple: (time in seconds, peak memory in KB or 0.0 if not traced).
+        """
+        if self.mode == 'off':
+            return 0.0, 0.0
+        elapsed = (time.perf_counter_ns() - token[0]) / 1e9
+        memory = 0.0
+        if token[1]:
+            # Chỉ tính phần bộ nhớ cấp phát thêm trong lần gọi này
+            memory = (tracemalloc.get_traced_memory()[1] - token[2]) / 1024
+            # Chế độ 'full' giữ tracemalloc chạy liên tục, chỉ reset peak mỗi lần đo
+            if self._owns_tracing and self.mode != 'full':
+                tracemalloc.stop()
+                self._owns_tracing = False
+        return elapsed, memory
+
+    def record(self, entry):
+        """Lưu một bản ghi metric (dict) vào bộ thu thập chung."""
+        if self.mode == 'off':
+            return
+        self.records.append(entry)
+        totals = self.totals.get(entry["algorithm"])
+        if totals is None:
+            totals = self.totals[entry["algorithm"]] = {
+                "count": 0, "reused": 0, "cached": 0, "time": 0.0, "memory": 0.0, "nodes": 0, "max_time": 0.0}
+        totals["count"] += 1
+        totals["reused"] += 1 if entry.get("reused") else 0
+        totals["cached"] += 1 if entry.get("cached") else 0
+        totals["time"] += entry["time"]
+        totals["memory"] += entry["memory"]
+        totals["nodes"] += entry["nodes"]
+        if entry["time"] > totals["max_time"]:
+            totals["max_time"] = entry["time"]
+
+    def summary(self):
+        """
+        Aggregate metrics per algorithm.
+
+        Means cover every recorded call; percentiles cover the records still
+        in the ring buffer.
+
+        Returns:
+            dict: {algorithm: {"count", "reused", "cached", "mean_time", "max_time",
+            "mean_memory", "mean_nodes", "p50_time", "p95_time"}}
+        """
+        window = {}
+        for entry in self.records:
+            window.setdefault(entry["algorithm"], []).append(entry["time"])
+        result = {}
+        for algorithm, totals in self.totals.items():
+            count = totals["count"]
+            times = sorted(window.get(algorithm, []))
+            result[algorithm] = {
+                "count": count,
+                "reused": totals["reused"],
+                "cached": totals["cached"],
+                "mean_time": totals["time"] / count,
+                "max_time": totals["max_time"],
+                "mean_memory": totals["memory"] / count,
+                "mean_nodes": totals["nodes"] / count,
+                "p50_time": times[len(times) // 2] if times else 0.0,
+                "p95_time": times[min(len(times) - 1, int(len(times) * 0.95))] if times else 0.0,
+            }
+        return result
+
+    def count(self, name, n=1):
+        """Tăng bộ đếm có tên (bỏ qua ở chế độ 'off')."""
+        if self.mode != 'off':
+            self.counters[name] += n
+
+    def clear(self):
+        self.records.clear()
+        self.totals = {}
+        self.counters.clear()
+
+    def close(self):
+        """Dừng tracemalloc nếu collector đã bật nó."""
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+
+# Bộ thu thập mặc định cho các ghost không được truyền collector riêng
+default_collector = MetricsCollector('timing')
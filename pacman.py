@@ -19,6 +19,7 @@ class PacMan:
         self.move_progress = 0.0   # Progress towards the next cell (0 to 1)
         self.cell_size = cell_size
         self.requested_direction = (0, 0)  # Hướng người chơi yêu cầu
+        self.ate_power_pellet = False  # Đặt khi ăn power pellet; Simulation đọc rồi xóa trong cùng tick
 
     def move(self, maze, new_direction):
         """
@@ -79,13 +80,21 @@ class PacMan:
     def _eat_dot(self, maze):
         """Update score when Pac-Man eats a dot or power pellet."""
         x, y = self.position
-        if maze.is_dot(x, y):
+        eaten = maze.eat(x, y)  # Remove dot/power pellet and update the maze's dot counter
+        if eaten == 1:
             self.score += 10
-            maze.board[y][x] = 0  # Remove dot from the maze
-        elif maze.is_power_pellet(x, y):
+        elif eaten == 2:
             self.score += 50
-            maze.board[y][x] = 0  # Remove power pellet
-            # TODO: Trigger ghost "frightened" mode (add logic in ghost.py)
+            self.ate_power_pellet = True  # Simulation chuyển ghost sang chế độ frightened
+
+    def snapshot(self):
+        """Trạng thái bất biến (tuple) để restore() về sau."""
+        return (self.position, self.pixel_position, self.score, self.lives, self.direction,
+                self.requested_direction, self.move_progress)
+
+    def restore(self, state):
+        (self.position, self.pixel_position, self.score, self.lives, self.direction,
+         self.requested_direction, self.move_progress) = state
 
     def reset(self, start_pos):
         """Reset Pac-Man's position and direction after losing a life."""
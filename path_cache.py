@@ -0,0 +1,75 @@
+"""
+Size-bounded LRU cache of ghost paths shared by every ghost of a game.
+
+Keys are (algorithm, start, target, board version). Maze.version is a
+fingerprint of ghost passability, so eating dots keeps entries valid,
+changing a wall or the gate makes them unreachable, and a fresh Maze with
+the same layout (after a level restart) hits the same entries. Stale
+versions simply age out of the LRU order.
+"""
+import collections
+
+
+class PathCache:
+    def __init__(self, capacity=4096, metrics=None):
+        """
+        Args:
+            capacity (int): Maximum number of cached paths.
+            metrics (MetricsCollector, optional): Collector whose counters
+                receive path_cache.hit / .miss / .eviction.
+        """
+        self.capacity = max(1, capacity)
+        self.metrics = metrics
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(algorithm, start, target, maze):
+        return (algorithm, start, target, maze.version)
+
+    def get(self, key):
+        """
+        Look up a path and mark it most recently used.
+
+        Returns:
+            tuple: Cached cells after start up to target (empty if the search
+            failed), or None on a miss.
+        """
+        path = self.entries.get(key)
+        if path is None:
+            self.misses += 1
+            self._count("path_cache.miss")
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        self._count("path_cache.hit")
+        return path
+
+    def put(self, key, path):
+        """Lưu đường đi (bản sao dạng tuple), loại mục ít dùng nhất khi đầy."""
+        self.entries[key] = tuple(path)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+            self._count("path_cache.eviction")
+
+    def _count(self, name):
+        if self.metrics is not None:
+            self.metrics.count(name)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        self.entries.clear()
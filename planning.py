@@ -0,0 +1,165 @@
+"""
+Shared planning service: one reverse search per Pac-Man move for all ghosts.
+
+SharedPlanner runs a BFS from Pac-Man's cell whenever that cell (or the
+maze) changes and caches the resulting distance field. Any number of
+ghosts then get their path by descending the field, so planning cost per
+frame no longer grows with the number of ghosts.
+
+The same field seeds the flee map used by frightened ghosts: distances
+are scaled by -FLEE_FACTOR and relaxed once more (a "Dijkstra map"), so
+descending it leads away from Pac-Man towards escape routes rather than
+into the nearest dead end.
+
+Eaten ghosts descend a third field, rooted at the ghost house, which is
+built once per maze and reused for every ghost eaten on it.
+"""
+import collections
+import heapq
+from array import array
+
+# Hệ số nhân khoảng cách khi tạo flee map (>1 để ghost chịu đi vòng qua gần Pac-Man nếu lối thoát xa hơn)
+FLEE_FACTOR = 1.2
+# Giá trị flee map lưu theo đơn vị 1/FLEE_SCALE bước để dùng số nguyên
+FLEE_SCALE = 10
+UNREACHABLE = 2 ** 30
+
+
+def _bfs_field(maze, sources):
+    """BFS đa nguồn trên bảng láng giềng; trả về (khoảng cách theo id ô, -1 nếu không tới được; số nút)."""
+    neighbor_start, neighbor_cells = maze.neighbor_start, maze.neighbor_cells
+    dist = array('i', [-1]) * maze.size
+    for cell in sources:
+        dist[cell] = 0
+    queue = collections.deque(sources)
+    expanded_nodes = 0
+    while queue:
+        current = queue.popleft()
+        expanded_nodes += 1
+        d = dist[current] + 1
+        for k in range(neighbor_start[current], neighbor_start[current + 1]):
+            neighbor = neighbor_cells[k]
+            if dist[neighbor] < 0:
+                dist[neighbor] = d
+                queue.append(neighbor)
+    return dist, expanded_nodes
+
+
+class SharedPlanner:
+    def __init__(self):
+        self.maze = None
+        self.target = None
+        self.dist = None
+        self.searches = 0  # Số lần phải chạy lại BFS
+        self._neighbors = None
+        self.flee = None
+        self._flee_source = None  # Trường khoảng cách đã dùng để tạo flee map hiện tại
+        self.flee_searches = 0  # Số lần phải tính lại flee map
+        self.home = None
+        self._home_key = None  # (maze, các ô nhà, neighbor_cells) của trường về nhà hiện tại
+
+    def distance_field(self, maze, target_pos):
+        """
+        Distance from every cell to target_pos, recomputed only when needed.
+
+        Returns:
+            tuple: (array of distances indexed by cell id, -1 if unreachable;
+            nodes expanded by this call, 0 when the cached field was reused).
+        """
+        # neighbor_cells được tạo lại khi tường thay đổi, nên so sánh identity là đủ
+        if (maze is self.maze and target_pos == self.target
+                and maze.neighbor_cells is self._neighbors):
+            return self.dist, 0
+
+        dist, expanded_nodes = _bfs_field(maze, [maze.cell_id(*target_pos)])
+        self.maze = maze
+        self.target = target_pos
+        self.dist = dist
+        self._neighbors = maze.neighbor_cells
+        self.searches += 1
+        return dist, expanded_nodes
+
+    def path(self, maze, start_pos, target_pos):
+        """
+        Path from start_pos to target_pos by descending the shared field.
+
+        Returns:
+            dict: {"path": cells after start up to target, "nodes": nodes
+            expanded by this call (0 if another ghost already paid for it)}.
+        """
+        dist, expanded_nodes = self.distance_field(maze, target_pos)
+        cell = maze.cell_id(*start_pos)
+        if dist[cell] < 0:
+            return {"path": [], "nodes": expanded_nodes}
+        neighbor_start, neighbor_cells = maze.neighbor_start, maze.neighbor_cells
+        path = []
+        while dist[cell] > 0:
+            # Ô láng giềng đầu tiên gần đích hơn một bước
+            d = dist[cell] - 1
+            for k in range(neighbor_start[cell], neighbor_start[cell + 1]):
+                if dist[neighbor_cells[k]] == d:
+                    cell = neighbor_cells[k]
+                    break
+            path.append(maze.cell_pos(cell))
+        return {"path": path, "nodes": expanded_nodes}
+
+    def flee_field(self, maze, pacman_pos):
+        """
+        Flee map away from pacman_pos, recomputed only when Pac-Man changes
+        cell (or the maze changes) and shared by every frightened ghost.
+
+        Returns:
+            tuple: (array of flee values indexed by cell id, lower is safer,
+            UNREACHABLE for cells cut off from Pac-Man; nodes expanded by
+            this call, 0 when the cached map was reused).
+        """
+        # Flee map chỉ phụ thuộc trường khoảng cách: còn dùng được khi trường đó chưa bị tính lại
+        dist, expanded_nodes = self.distance_field(maze, pacman_pos)
+        if dist is self._flee_source:
+            return self.flee, 0
+
+        step = FLEE_SCALE
+        seed = -int(FLEE_FACTOR * FLEE_SCALE)
+        flee = array('i', [UNREACHABLE]) * maze.size
+        queue = []
+        for cell in range(maze.size):
+            if dist[cell] >= 0:
+                flee[cell] = seed * dist[cell]
+                queue.append((flee[cell], cell))
+        heapq.heapify(queue)
+        # Dijkstra đa nguồn: mỗi ô bắt đầu với giá trị -FLEE_FACTOR * khoảng cách rồi được nới lỏng
+        neighbor_start, neighbor_cells = maze.neighbor_start, maze.neighbor_cells
+        while queue:
+            value, current = heapq.heappop(queue)
+            if value != flee[current]:
+                continue
+            expanded_nodes += 1
+            value += step
+            for k in range(neighbor_start[current], neighbor_start[current + 1]):
+                neighbor = neighbor_cells[k]
+                if value < flee[neighbor]:
+                    flee[neighbor] = value
+                    heapq.heappush(queue, (value, neighbor))
+
+        self.flee = flee
+        self._flee_source = dist
+        self.flee_searches += 1
+        return flee, expanded_nodes
+
+    def home_field(self, maze, homes):
+        """
+        Distance from every cell to the nearest of the homes cells (the
+        ghost house), built once per maze and shared by every eaten ghost.
+
+        Eating dots never changes it, so one BFS per level is enough.
+
+        Returns:
+            tuple: (array of distances indexed by cell id, -1 if unreachable;
+            nodes expanded by this call, 0 when the cached field was reused).
+        """
+        key = self._home_key
+        if key is not None and key[0] is maze and key[1] == homes and key[2] is maze.neighbor_cells:
+            return self.home, 0
+        self.home, expanded_nodes = _bfs_field(maze, [maze.cell_id(*cell) for cell in homes])
+        self._home_key = (maze, homes, maze.neighbor_cells)
+        return self.home, expanded_nodes
@@ -0,0 +1,303 @@
+"""
+Compact binary replay logs and headless playback.
+
+A Recorder attached to a Simulation appends one record per level start
+and one per tick (player input, Pac-Man and ghost cells, and each ghost's
+planning nodes/time for that tick). The file is append-only; close()
+adds a small index of level-start offsets, and a log cut short by a crash
+is still readable by a sequential scan.
+
+File layout (little-endian):
+
+    b"PMR3"
+    b"L" level ghost_count node_budget flags, then per ghost: id, len, algorithm
+    b"T" direction pacman_x pacman_y lives, then per ghost: x y nodes time_us mode
+    ...
+    b"I" count, count * (level, offset of its b"L")   (written by close)
+    index_offset b"PMRI"                               (trailer)
+
+direction is 0 for no input or 1 + its index in maze.DIRECTIONS; in
+levels 1-5 it is the autopilot's choice. flags bit 0 marks an autopilot
+level, bit 1 a level played with frightened mode on. mode is 0 chase,
+1 frightened, 2 eaten.
+
+Playback:
+
+    resimulate(path)   re-runs every level with the recorded inputs and
+                       algorithms and reports the first tick whose positions
+                       diverge (synchronous planning is deterministic; logs
+                       recorded with async planning or a time budget are not)
+    evaluate(path, a)  locks ghosts and Pac-Man to the recorded cells and
+                       re-plans chasing ghosts with algorithm a on every
+                       tick, so per-tick cost is compared on exactly the
+                       same trajectories
+
+Usage:
+    python main.py --record session.pmr
+    python replay.py session.pmr
+    python replay.py session.pmr --algorithm JPS HPA --metrics-mode timing
+"""
+import argparse
+import collections
+import struct
+
+from ghost import Ghost, CHASE, FRIGHTENED, EATEN
+from maze import Maze, DIRECTIONS
+from metrics import MetricsCollector, MODES
+
+MAGIC = b"PMR3"
+INDEX_MAGIC = b"PMRI"
+_LEVEL = struct.Struct("<cBBIB")
+FLAG_AUTOPILOT = 1
+FLAG_FRIGHTENED = 2
+_GHOST_INFO = struct.Struct("<cB")
+_TICK = struct.Struct("<cBHHB")
+_GHOST_TICK = struct.Struct("<HHIfB")
+_INDEX = struct.Struct("<cI")
+_INDEX_ENTRY = struct.Struct("<BQ")
+_TRAILER = struct.Struct("<Q4s")
+
+_DIRECTION_CODES = {direction: i + 1 for i, direction in enumerate(DIRECTIONS)}
+_DIRECTION_CODES[(0, 0)] = 0
+_CODE_DIRECTIONS = {code: direction for direction, code in _DIRECTION_CODES.items()}
+_MODE_CODES = {CHASE: 0, FRIGHTENED: 1, EATEN: 2}
+_CODE_MODES = {code: mode for mode, code in _MODE_CODES.items()}
+
+Tick = collections.namedtuple("Tick", "direction pacman lives ghosts")
+GhostTick = collections.namedtuple("GhostTick", "position nodes time_us mode")
+Segment = collections.namedtuple("Segment", "level ghosts node_budget ticks autopilot frightened")
+
+
+class Recorder:
+    def __init__(self, path):
+        """Open path for writing; the file is valid to read at every tick boundary."""
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.index = []  # (level, offset của bản ghi 'L')
+        self.ticks = 0
+
+    def begin_level(self, sim):
+        """Ghi bản ghi bắt đầu cấp độ: ghost và thuật toán của chúng."""
+        self.index.append((sim.current_level, self.file.tell()))
+        flags = FLAG_AUTOPILOT if sim.autopilot is not None and sim.current_level != 6 else 0
+        if sim.frightened:
+            flags |= FLAG_FRIGHTENED
+        self.file.write(_LEVEL.pack(b"L", sim.current_level, len(sim.ghosts), sim.node_budget or 0, flags))
+        for ghost in sim.ghosts:
+            algorithm = ghost.algorithm.encode()
+            self.file.write(_GHOST_INFO.pack(ghost.id.encode(), len(algorithm)))
+            self.file.write(algorithm)
+
+    def record_tick(self, sim, direction, tick_metrics):
+        """
+        Append one tick.
+
+        Args:
+            sim (Simulation): State after the tick.
+            direction (tuple): Player input fed to step().
+            tick_metrics (dict): Ghost id -> find_path metrics of this tick.
+        """
+        x, y = sim.pacman.position
+        parts = [_TICK.pack(b"T", _DIRECTION_CODES.get(tuple(direction), 0), x, y,
+                            max(0, sim.pacman.lives))]
+        for ghost in sim.ghosts:
+            metrics = tick_metrics.get(ghost.id)
+            nodes, elapsed = (metrics["nodes"], metrics["time"]) if metrics else (0, 0.0)
+            parts.append(_GHOST_TICK.pack(ghost.position[0], ghost.position[1], nodes, elapsed * 1e6,
+                                          _MODE_CODES[ghost.mode]))
+        self.file.write(b"".join(parts))
+        self.ticks += 1
+
+    def close(self):
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        self.file.write(_INDEX.pack(b"I", len(self.index)))
+        for level, offset in self.index:
+            self.file.write(_INDEX_ENTRY.pack(level, offset))
+        self.file.write(_TRAILER.pack(index_offset, INDEX_MAGIC))
+        self.file.close()
+
+
+class ReplayReader:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        if self.data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: not a replay log")
+        self.index = self._read_index()
+
+    def _read_index(self):
+        """Đọc chỉ mục cuối file; None nếu log bị cắt ngang (chưa close)."""
+        data = self.data
+        if len(data) < len(MAGIC) + _TRAILER.size:
+            return None
+        index_offset, magic = _TRAILER.unpack_from(data, len(data) - _TRAILER.size)
+        if magic != INDEX_MAGIC:
+            return None
+        _, count = _INDEX.unpack_from(data, index_offset)
+        offset = index_offset + _INDEX.size
+        entries = []
+        for _ in range(count):
+            entries.append(_INDEX_ENTRY.unpack_from(data, offset))
+            offset += _INDEX_ENTRY.size
+        self.end = index_offset
+        return entries
+
+    def _parse_segment(self, offset, end):
+        data = self.data
+        _, level, ghost_count, node_budget, flags = _LEVEL.unpack_from(data, offset)
+        offset += _LEVEL.size
+        ghosts = []
+        for _ in range(ghost_count):
+            ghost_id, length = _GHOST_INFO.unpack_from(data, offset)
+            offset += _GHOST_INFO.size
+            ghosts.append((ghost_id.decode(), data[offset:offset + length].decode()))
+            offset += length
+        ticks = []
+        record_size = _TICK.size + ghost_count * _GHOST_TICK.size
+        while offset + record_size <= end and data[offset:offset + 1] == b"T":
+            _, code, x, y, lives = _TICK.unpack_from(data, offset)
+            offset += _TICK.size
+            ghost_ticks = []
+            for _ in range(ghost_count):
+                gx, gy, nodes, time_us, mode = _GHOST_TICK.unpack_from(data, offset)
+                ghost_ticks.append(GhostTick((gx, gy), nodes, time_us, _CODE_MODES.get(mode, CHASE)))
+                offset += _GHOST_TICK.size
+            ticks.append(Tick(_CODE_DIRECTIONS.get(code, (0, 0)), (x, y), lives, ghost_ticks))
+        return Segment(level, ghosts, node_budget or None, ticks,
+                       bool(flags & FLAG_AUTOPILOT), bool(flags & FLAG_FRIGHTENED)), offset
+
+    def segment(self, i):
+        """Đọc cấp độ thứ i nhờ chỉ mục, không phải phân tích các cấp độ trước."""
+        if self.index is None:
+            return list(self.segments())[i]
+        end = self.index[i + 1][1] if i + 1 < len(self.index) else self.end
+        return self._parse_segment(self.index[i][1], end)[0]
+
+    def segments(self):
+        """Lần lượt từng cấp độ đã ghi (quét tuần tự nếu log không có chỉ mục)."""
+        if self.index is not None:
+            for i in range(len(self.index)):
+                yield self.segment(i)
+            return
+        offset, end = len(MAGIC), len(self.data)
+        while offset + _LEVEL.size <= end and self.data[offset:offset + 1] == b"L":
+            segment, offset = self._parse_segment(offset, end)
+            yield segment
+
+
+def resimulate(path, metrics=None):
+    """
+    Re-run a log with its recorded inputs and algorithms.
+
+    Returns:
+        list: Per level {"level", "ticks", "diverged_at" (tick index or
+        None)}; metrics (if given) collects the re-run's planning cost.
+    """
+    from simulation import Simulation
+    report = []
+    for segment in ReplayReader(path).segments():
+        recorded = [(0, 0)]  # Hướng autopilot đã ghi cho tick đang chạy
+        autopilot = (lambda sim: recorded[0]) if segment.autopilot else None
+        sim = Simulation(metrics=metrics or 'off', node_budget=segment.node_budget, autopilot=autopilot,
+                         frightened=segment.frightened)
+        sim.initialize_level(segment.level)
+        algorithms = dict(segment.ghosts)
+        for ghost in sim.ghosts:
+            ghost.algorithm = algorithms.get(ghost.id, ghost.algorithm)
+        diverged_at = None
+        for i, tick in enumerate(segment.ticks):
+            recorded[0] = tick.direction
+            sim.step(tick.direction)
+            if diverged_at is None and (
+                    sim.pacman.position != tick.pacman
+                    or any(ghost.position != g.position for ghost, g in zip(sim.ghosts, tick.ghosts))):
+                diverged_at = i
+        report.append({"level": segment.level, "ticks": len(segment.ticks), "diverged_at": diverged_at})
+    return report
+
+
+def evaluate(path, algorithm=None, metrics_mode='timing'):
+    """
+    Re-plan every recorded tick on the recorded trajectories.
+
+    Ghost and Pac-Man cells are set from the log before each tick; each
+    chasing ghost then runs find_path with ``algorithm`` (its recorded one
+    if None), keeping its path between ticks as in the game. Frightened and
+    eaten ghosts do not search in the game, so they are skipped here too.
+    Dots are eaten along Pac-Man's recorded cells.
+
+    Returns:
+        dict: {"recorded": per-tick totals from the log, "replayed": the
+        same totals for this run}; each holds "ticks", "nodes", "time_us",
+        "p99_tick_us" and "max_tick_us".
+    """
+    metrics = MetricsCollector(metrics_mode)
+    recorded, replayed = [], []
+    for segment in ReplayReader(path).segments():
+        maze = Maze()
+        ghosts = [Ghost(ghost_id, maze.ghosts.get(ghost_id, maze.pacman_pos), algorithm or recorded_algorithm,
+                        0, metrics, node_budget=segment.node_budget)
+                  for ghost_id, recorded_algorithm in segment.ghosts]
+        for tick in segment.ticks:
+            recorded.append((sum(g.nodes for g in tick.ghosts), sum(g.time_us for g in tick.ghosts)))
+            maze.eat(*tick.pacman)
+            nodes = time_us = 0
+            for ghost, recorded_ghost in zip(ghosts, tick.ghosts):
+                if ghost.position != recorded_ghost.position:
+                    # Bước theo đường đang giữ như Ghost.move; vị trí khác (mất mạng) thì bỏ đường
+                    if ghost.path and ghost.path[0] == recorded_ghost.position:
+                        ghost.path.pop(0)
+                    else:
+                        ghost.path = []
+                    ghost.position = recorded_ghost.position
+                if recorded_ghost.mode != CHASE:
+                    # Bỏ chạy/về nhà không tìm đường; quay lại đuổi thì tìm lại từ đầu như revive()
+                    ghost.path = []
+                    ghost.last_target = None
+                    continue
+                result = ghost.find_path(maze, tick.pacman)
+                nodes += result["nodes"]
+                time_us += result["time"] * 1e6
+            replayed.append((nodes, time_us))
+    return {"recorded": _totals(recorded), "replayed": _totals(replayed)}
+
+
+def _totals(per_tick):
+    times = sorted(t for _, t in per_tick)
+    return {
+        "ticks": len(per_tick),
+        "nodes": sum(n for n, _ in per_tick),
+        "time_us": sum(times),
+        "p99_tick_us": times[min(len(times) - 1, int(len(times) * 0.99))] if times else 0.0,
+        "max_tick_us": times[-1] if times else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded Pac-Man session.")
+    parser.add_argument("log")
+    parser.add_argument("--algorithm", nargs="+",
+                        help="evaluate these algorithms on the recorded trajectories")
+    parser.add_argument("--metrics-mode", choices=MODES, default='timing')
+    args = parser.parse_args(argv)
+
+    if not args.algorithm:
+        for row in resimulate(args.log):
+            status = "identical" if row["diverged_at"] is None else f"diverged at tick {row['diverged_at']}"
+            print(f"level {row['level']}: {row['ticks']} ticks, {status}")
+        return
+
+    print(f"{'algorithm':<10}{'ticks':>8}{'nodes':>12}{'total ms':>10}{'p99 us':>10}{'max us':>10}")
+    rows = [("recorded", evaluate(args.log, None, args.metrics_mode)["recorded"])]
+    rows += [(algorithm, evaluate(args.log, algorithm, args.metrics_mode)["replayed"])
+             for algorithm in args.algorithm]
+    for name, totals in rows:
+        print(f"{name:<10}{totals['ticks']:>8}{totals['nodes']:>12}{totals['time_us'] / 1000:>10.1f}"
+              f"{totals['p99_tick_us']:>10.1f}{totals['max_tick_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+import collections
+import logging
+
+from maze import Maze
+from ghost import Ghost, CHASE, FRIGHTENED, EATEN
+from pacman import PacMan
+from metrics import MetricsCollector
+from planning import SharedPlanner
+from path_cache import PathCache
+from async_planner import AsyncPlanner
+from autopilot import Autopilot
+
+logger = logging.getLogger(__name__)
+
+CELL_SIZE = 20
+TICK_RATE = 60  # Số tick mô phỏng cho mỗi giây thời gian game
+MAX_TICKS_PER_FRAME = 600  # Giới hạn tick bù cho một frame khi render bị khựng
+FRIGHTENED_TICKS = 6 * TICK_RATE  # Thời gian ghost hoảng sợ sau khi Pac-Man ăn power pellet
+GHOST_EAT_SCORES = (200, 400, 800, 1600)  # Điểm cho ghost thứ 1, 2, 3, 4 bị ăn trong một lần hoảng sợ
+
+# Ghost (id, thuật toán) cho từng cấp độ
+LEVEL_GHOSTS = {
+    1: [('B', 'BFS')],
+    2: [('P', 'DFS')],
+    3: [('O', 'UCS')],
+    4: [('R', 'A*')],
+    5: [('B', 'BFS'), ('P', 'DFS'), ('O', 'UCS'), ('R', 'A*')],
+    6: [('B', 'BFS'), ('P', 'DFS'), ('O', 'UCS'), ('R', 'A*')],
+}
+
+
+# Ảnh chụp trạng thái game; maze_mark là vị trí trong nhật ký hoàn tác của maze
+GameState = collections.namedtuple(
+    "GameState", "maze maze_mark pacman ghosts player_moved game_over game_won ticks "
+                 "frightened_ticks ghosts_eaten")
+
+
+class FixedTimestep:
+    def __init__(self, tick_rate=TICK_RATE, speed=1.0, max_ticks_per_frame=MAX_TICKS_PER_FRAME):
+        """
+        Accumulator that turns elapsed wall time into a whole number of
+        fixed-length simulation ticks, independent of the frame rate.
+
+        Args:
+            tick_rate (int): Simulation ticks per second of game time.
+            speed (float): Fast-forward multiplier (2.0 = twice real time).
+            max_ticks_per_frame (int): Cap on ticks returned by one advance();
+                the backlog beyond it is dropped so a long stall cannot make
+                the next frames fall further and further behind.
+        """
+        self.tick_dt = 1.0 / tick_rate
+        self.speed = speed
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0.0
+
+    def advance(self, frame_seconds):
+        """
+        Add one frame's elapsed wall time.
+
+        Returns:
+            int: Number of ticks to simulate for this frame.
+        """
+        self.accumulator += frame_seconds * self.speed
+        ticks = int(self.accumulator / self.tick_dt)
+        if ticks > self.max_ticks_per_frame:
+            ticks = self.max_ticks_per_frame
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks * self.tick_dt
+        return ticks
+
+    def reset(self):
+        self.accumulator = 0.0
+
+
+class Simulation:
+    def __init__(self, level=0, cell_size=CELL_SIZE, metrics=None, algorithm=None,
+                 path_cache=True, async_planning=None, node_budget=None, time_budget_us=None,
+                 recorder=None, autopilot=None, frightened=True):
+        """
+        Headless game engine: owns the maze, Pac-Man and ghosts, no pygame.
+
+        Args:
+            level (int): Level to start (1-6); 0 leaves the game uninitialized.
+            cell_size (int): Pixel size of a cell, only used for the entities'
+                interpolated pixel positions.
+            metrics (MetricsCollector | str, optional): Collector shared by all
+                ghosts, or a metrics mode name; defaults to timing only.
+            algorithm (str, optional): Run every ghost with this algorithm
+                instead of the level's default (e.g. 'FIELD' for one shared
+                search per Pac-Man move).
+            path_cache (PathCache | bool): LRU path cache shared by all ghosts
+                for the whole session (lives and levels); True creates one,
+                False disables caching.
+            async_planning (str, optional): 'thread' or 'process' to run ghost
+                searches in the background (see AsyncPlanner); ghosts keep
+                their previous path until a result arrives, so runs are no
+                longer deterministic. None plans synchronously.
+            node_budget (int, optional): Nodes each ghost may expand per tick;
+                BFS/DFS/UCS/A*/ARA* searches then resume on the next tick.
+            time_budget_us (float, optional): Same, as wall time per ghost.
+            recorder (replay.Recorder, optional): Receives every level start
+                and tick for later playback.
+            autopilot (callable | bool, optional): Controller that drives
+                Pac-Man in levels 1-5 (called like a run() controller); True
+                uses Autopilot, which chases the nearest remaining dot.
+            frightened (bool): Power pellets frighten the ghosts for
+                FRIGHTENED_TICKS; False keeps them chasing (pellets only score).
+        """
+        if metrics is None or isinstance(metrics, str):
+            metrics = MetricsCollector(metrics or 'timing')
+        self.metrics = metrics
+        self.algorithm = algorithm
+        self.planner = SharedPlanner()  # Dùng chung cho mọi ghost chế độ 'FIELD'
+        if path_cache is True:
+            path_cache = PathCache(metrics=metrics)
+        self.path_cache = path_cache or None
+        self.node_budget = node_budget
+        self.recorder = recorder
+        self.time_budget_us = time_budget_us
+        self.autopilot = Autopilot() if autopilot is True else autopilot or None
+        self.frightened = frightened
+        self.async_planner = None
+        if async_planning:
+            self.async_planner = AsyncPlanner(async_planning, metrics=metrics, path_cache=self.path_cache)
+        self.cell_size = cell_size
+        self.current_level = 0
+        # Maze gốc: mỗi cấp độ dùng một bản copy. Bảng láng giềng dùng chung ngay; bảng APSP và đồ thị
+        # junction được dựng chậm trên _layout khi cấp độ đầu tiên cần, các cấp độ sau dùng lại
+        self._layout = Maze()
+        self.maze = self._layout.copy()
+        self.pacman = PacMan(self.maze.pacman_pos, cell_size)
+        self.ghosts = []
+        self.game_over = False
+        self.game_won = False
+        self.player_moved = False
+        self.ticks = 0
+        self.frightened_ticks = 0  # Số tick hoảng sợ còn lại
+        self.ghosts_eaten = 0      # Số ghost đã ăn trong lần hoảng sợ hiện tại
+        if level:
+            self.initialize_level(level)
+
+    def initialize_level(self, level=None):
+        """Khởi tạo cấp độ (mặc định là cấp độ hiện tại)."""
+        if level is not None:
+            self.current_level = level
+        self.maze = self._layout.copy()
+        self.pacman = PacMan(self.maze.pacman_pos, self.cell_size)
+        self.planner = SharedPlanner()
+        self.ghosts = [Ghost(ghost_id, self.maze.ghosts[ghost_id], self.algorithm or algorithm,
+                             self.cell_size, self.metrics, self.planner, self.path_cache,
+                             self.node_budget, self.time_budget_us)
+                       for ghost_id, algorithm in LEVEL_GHOSTS.get(self.current_level, [])]
+        self.player_moved = False
+        self.game_over = False
+        self.game_won = False
+        self.ticks = 0
+        self.frightened_ticks = 0
+        self.ghosts_eaten = 0
+        if self.frightened and self.ghosts:
+            # Dựng trường về nhà ngay khi vào cấp độ, để lần ăn ghost đầu tiên không làm khựng frame
+            self.planner.home_field(self.maze, tuple(self.maze.ghosts.values()))
+        if self.async_planner is not None:
+            self.async_planner.invalidate()
+        if self.autopilot is not None and hasattr(self.autopilot, "reset"):
+            self.autopilot.reset()
+        if self.recorder is not None:
+            self.recorder.begin_level(self)
+
+    @property
+    def finished(self):
+        return self.game_over or self.game_won
+
+    @property
+    def game_time(self):
+        """Thời gian game (giây) đã mô phỏng ở cấp độ hiện tại."""
+        return self.ticks / TICK_RATE
+
+    def step(self, direction=(0, 0)):
+        """
+        Advance the game by one tick.
+
+        Args:
+            direction (tuple): Player input for this tick; only applied in
+                Level 6, where Pac-Man is user-controlled. In levels 1-5 the
+                autopilot (if any) chooses the direction instead.
+        """
+        if self.finished or not self.current_level:
+            return
+        self.ticks += 1
+        tick_metrics = {}  # ghost id -> metrics của tick này (cho recorder)
+
+        # Điều khiển Pac-Man: người chơi ở Level 6, autopilot (nếu có) ở Level 1-5
+        if self.current_level == 6:
+            if direction != (0, 0):
+                self.player_moved = True
+            self.pacman.move(self.maze, direction)
+        elif self.autopilot is not None:
+            direction = self.autopilot(self)
+            self.pacman.move(self.maze, direction)
+        if self.pacman.ate_power_pellet:
+            self.pacman.ate_power_pellet = False
+            if self.frightened:
+                self._frighten_ghosts()
+
+        # Update ghosts only if player has moved (or in level 1-5, ghosts move immediately)
+        if self.current_level in [1, 2, 3, 4, 5] or self.player_moved:
+            for ghost in self.ghosts:
+                if ghost.mode != CHASE:
+                    # Hoảng sợ: đọc flee map dùng chung; bị ăn: đi theo đường về nhà. Không tìm kiếm riêng
+                    if ghost.mode == FRIGHTENED:
+                        nodes = ghost.flee_step(self.maze, self.planner, self.pacman.position)
+                        if nodes:
+                            ghost.metrics.count("flee_nodes", nodes)
+                    ghost.move(self.maze, self.pacman.position, plan=False)
+                    if ghost.mode == EATEN and not ghost.path:
+                        ghost.revive()
+                    continue
+                if self.async_planner is not None:
+                    # Không chờ tìm đường: nhận kết quả đã xong, gửi yêu cầu mới, đi theo đường cũ
+                    if self.async_planner.update(ghost, self.maze, self.pacman.position):
+                        tick_metrics[ghost.id] = ghost.last_metrics
+                    ghost.move(self.maze, self.pacman.position, plan=False)
+                    continue
+                # Gọi find_path để thu thập metrics và sau đó di chuyển ghost
+                metrics = tick_metrics[ghost.id] = ghost.find_path(self.maze, self.pacman.position)
+                ghost.move(self.maze, self.pacman.position)
+                logger.debug("Ghost %s metrics: Time=%.6fs, Memory=%.2fKB, Nodes=%d",
+                             ghost.id, metrics['time'], metrics['memory'], metrics['nodes'])
+
+        if self.frightened_ticks:
+            self.frightened_ticks -= 1
+            if not self.frightened_ticks:
+                for ghost in self.ghosts:
+                    ghost.calm()
+
+        # Check collisions with ghosts
+        for ghost in self.ghosts:
+            if ghost.position == self.pacman.position:
+                if ghost.mode == EATEN:
+                    continue
+                if ghost.mode == FRIGHTENED:
+                    # Ăn ghost: điểm tăng gấp đôi cho mỗi ghost tiếp theo, ghost quay về nhà
+                    self.pacman.score += GHOST_EAT_SCORES[min(self.ghosts_eaten, len(GHOST_EAT_SCORES) - 1)]
+                    self.ghosts_eaten += 1
+                    nodes = ghost.send_home(self.maze, self.planner)
+                    if nodes:
+                        ghost.metrics.count("home_nodes", nodes)
+                    continue
+                self.pacman.lives -= 1
+                if self.pacman.lives <= 0:
+                    self.game_over = True
+                else:
+                    # Reset Pac-Man and ghosts
+                    self.pacman.reset(self.maze.pacman_pos)
+                    for ghost in self.ghosts:
+                        ghost.reset()
+                    if self.async_planner is not None:
+                        self.async_planner.invalidate()
+                    self.player_moved = False
+                    self.frightened_ticks = 0
+                break
+
+        # Check win condition (no dots or power pellets left) - Level 6 hoặc khi có autopilot
+        if (self.current_level == 6 or self.autopilot is not None) and self.maze.dots_remaining == 0:
+            self.game_won = True
+
+        if self.recorder is not None:
+            self.recorder.record_tick(self, direction, tick_metrics)
+
+    def _frighten_ghosts(self):
+        """Power pellet: mọi ghost (trừ ghost đang về nhà) chuyển sang hoảng sợ."""
+        self.frightened_ticks = FRIGHTENED_TICKS
+        self.ghosts_eaten = 0
+        for ghost in self.ghosts:
+            ghost.frighten()
+        if self.async_planner is not None:
+            self.async_planner.invalidate()  # Kết quả đang chờ là đường đuổi theo, không còn dùng
+
+    def snapshot(self):
+        """
+        Capture the game state for a later restore().
+
+        Costs O(ghost path lengths): eaten dots are not copied, only the
+        position in the maze's undo log is kept.
+
+        Returns:
+            GameState: Immutable snapshot, valid until the level changes.
+        """
+        return GameState(self.maze, self.maze.snapshot(), self.pacman.snapshot(),
+                         tuple(ghost.snapshot() for ghost in self.ghosts),
+                         self.player_moved, self.game_over, self.game_won, self.ticks,
+                         self.frightened_ticks, self.ghosts_eaten)
+
+    def restore(self, state):
+        """
+        Return to a snapshot of the current level in O(cells changed since).
+
+        Raises:
+            ValueError: If state belongs to another level or an undone branch.
+        """
+        if state.maze is not self.maze:
+            raise ValueError("Snapshot belongs to another level")
+        self.maze.restore(state.maze_mark)
+        self.pacman.restore(state.pacman)
+        for ghost, ghost_state in zip(self.ghosts, state.ghosts):
+            ghost.restore(ghost_state)
+        self.player_moved = state.player_moved
+        self.game_over = state.game_over
+        self.game_won = state.game_won
+        self.ticks = state.ticks
+        self.frightened_ticks = state.frightened_ticks
+        self.ghosts_eaten = state.ghosts_eaten
+        if self.async_planner is not None:
+            self.async_planner.invalidate()
+        if self.autopilot is not None and hasattr(self.autopilot, "reset"):
+            self.autopilot.reset()  # Đường autopilot thuộc nhánh cũ: tìm lại từ vị trí mới
+
+    def close(self):
+        """Dừng pool tìm đường nền và đóng recorder (nếu có)."""
+        if self.async_planner is not None:
+            self.async_planner.close()
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def run(self, max_ticks=None, controller=None):
+        """
+        Step the game as fast as possible until it ends or max_ticks is reached.
+
+        Args:
+            max_ticks (int, optional): Upper bound on the number of ticks.
+            controller (callable | tuple, optional): Called with the simulation
+                before every tick and returns the direction to feed to step();
+                a plain direction tuple is used for every tick.
+
+        Returns:
+            int: Number of ticks simulated.
+        """
+        start_ticks = self.ticks
+        if not self.current_level:
+            return 0
+        while not self.finished and (max_ticks is None or self.ticks - start_ticks < max_ticks):
+            if callable(controller):
+                direction = controller(self)
+            else:
+                direction = controller or (0, 0)
+            self.step(direction)
+        return self.ticks - start_ticks
@@ -0,0 +1,264 @@
+"""
+Batched Pac-Man environments stepped in lockstep with NumPy.
+
+VecEnv stores N independent Level-6 games (player-controlled Pac-Man) as
+struct-of-arrays state: cell ids, directions and move_progress of Pac-Man
+and every ghost, plus an (N, height, width) board of remaining dots. One
+step(actions) advances all N games with whole-array operations and
+follows the same per-tick rules as PacMan.move, Ghost.move and
+Simulation.step (speeds, progress accumulation, collisions, lives, win).
+Frightened mode is not modelled: power pellets only score, as in
+Simulation(frightened=False).
+
+Ghost policies are batched versions of the ghost.py algorithms. Every
+algorithm except DFS returns a shortest path, so they share one policy: a
+lookup in the maze's all-pairs next-hop table (the TABLE algorithm's
+path, identical to it tick for tick; the others may break ties between
+equally short paths differently). DFS keeps per-ghost path buffers, filled
+by Ghost.dfs with a memo per (cell, target), because its paths depend on
+where it started.
+
+Usage:
+    env = VecEnv(1024, seed=0)
+    rewards, dones = env.step(np.random.randint(0, 5, size=1024))
+"""
+import numpy as np
+
+from maze import Maze, DIRECTIONS
+from ghost import Ghost, DFS_MAX_PATH_LENGTH
+from simulation import LEVEL_GHOSTS
+
+PACMAN_SPEED = 0.1
+GHOST_SPEED = 0.05
+LIVES = 3
+
+# Action 0 = không bấm; 1..4 = DIRECTIONS[action - 1]
+NUM_ACTIONS = len(DIRECTIONS) + 1
+
+
+class VecEnv:
+    def __init__(self, n, maze=None, ghosts=None, auto_reset=True, seed=None):
+        """
+        Args:
+            n (int): Number of games.
+            maze (Maze, optional): Layout shared by all games; defaults to
+                the built-in board.
+            ghosts (list, optional): [(ghost id, algorithm)]; defaults to
+                Level 6's ghosts.
+            auto_reset (bool): Restart a game in the same step() it ends.
+            seed (int, optional): Seed for action_sample().
+        """
+        self.n = n
+        self.maze = maze or Maze()
+        self.ghost_specs = list(LEVEL_GHOSTS[6] if ghosts is None else ghosts)
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+        maze = self.maze
+        width = maze.width
+
+        self.initial_board = np.frombuffer(bytes(maze.grid), dtype=np.uint8).copy()
+        self.initial_dots = int(np.isin(self.initial_board, (1, 2)).sum())
+        # Bước đi theo id ô và mặt nạ hướng mở cho Pac-Man (không qua cửa)
+        self.delta = np.array([0] + [dy * width + dx for dx, dy in DIRECTIONS], dtype=np.int32)
+        pacman_pass = np.frombuffer(bytes(maze.pacman_pass), dtype=np.uint8)
+        open_dirs = np.zeros(maze.size, dtype=np.uint8)
+        cells = np.arange(maze.size)
+        xs, ys = cells % width, cells // width
+        for i, (dx, dy) in enumerate(DIRECTIONS):
+            nx, ny = xs + dx, ys + dy
+            inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < maze.height)
+            target = np.where(inside, ny * width + nx, 0)
+            open_dirs |= ((inside & (pacman_pass[target] == 1)).astype(np.uint8) << i)
+        self.pacman_open = open_dirs
+
+        # Bảng next-hop dùng chung cho mọi chính sách đường ngắn nhất
+        table_cells, _, next_hop = maze.distance_table()
+        count = len(table_cells)
+        self.cell_of_index = np.array([maze.cell_id(x, y) for x, y in table_cells], dtype=np.int32)
+        self.index_of_cell = np.full(maze.size, -1, dtype=np.int32)
+        self.index_of_cell[self.cell_of_index] = np.arange(count, dtype=np.int32)
+        self.next_hop = np.frombuffer(next_hop, dtype=np.int16 if next_hop.typecode == 'h' else np.int32)
+        self.next_hop = self.next_hop.reshape(count, count)
+
+        self.pacman_start = maze.cell_id(*maze.pacman_pos)
+        self.ghost_start = np.array([maze.cell_id(*maze.ghosts[ghost_id]) for ghost_id, _ in self.ghost_specs],
+                                    dtype=np.int32)
+        self.dfs_slots = [i for i, (_, algorithm) in enumerate(self.ghost_specs) if algorithm == 'DFS']
+        self.table_slots = np.array([i for i, (_, algorithm) in enumerate(self.ghost_specs)
+                                     if algorithm != 'DFS'], dtype=np.intp)
+        self._dfs_ghost = Ghost('P', maze.pacman_pos, 'DFS', 0)
+        self._dfs_memo = {}  # (ô, đích) -> đường DFS dạng tuple id ô
+
+        g = len(self.ghost_specs)
+        self.board = np.empty((n, maze.size), dtype=np.uint8)
+        self.pacman = np.empty(n, dtype=np.int32)
+        self.direction = np.empty(n, dtype=np.int8)
+        self.requested = np.empty(n, dtype=np.int8)
+        self.pacman_progress = np.empty(n, dtype=np.float64)
+        self.ghosts = np.empty((n, g), dtype=np.int32)
+        self.ghost_progress = np.empty((n, g), dtype=np.float64)
+        self.dfs_path = np.empty((n, len(self.dfs_slots), DFS_MAX_PATH_LENGTH), dtype=np.int32)
+        self.dfs_length = np.empty((n, len(self.dfs_slots)), dtype=np.int32)
+        self.dfs_next = np.empty((n, len(self.dfs_slots)), dtype=np.int32)
+        self.dfs_target = np.empty((n, len(self.dfs_slots)), dtype=np.int32)
+        self.player_moved = np.empty(n, dtype=bool)
+        self.score = np.empty(n, dtype=np.int64)
+        self.lives = np.empty(n, dtype=np.int8)
+        self.dots = np.empty(n, dtype=np.int32)
+        self.ticks = np.empty(n, dtype=np.int64)
+        self.game_over = np.empty(n, dtype=bool)
+        self.game_won = np.empty(n, dtype=bool)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Khởi tạo lại các game được chọn (mặc định: tất cả)."""
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+        self.board[mask] = self.initial_board
+        self.dots[mask] = self.initial_dots
+        self.score[mask] = 0
+        self.lives[mask] = LIVES
+        self.ticks[mask] = 0
+        self.game_over[mask] = False
+        self.game_won[mask] = False
+        self._reset_positions(mask)
+
+    def _reset_positions(self, mask):
+        # Như PacMan.reset và Ghost.reset sau khi mất một mạng
+        self.pacman[mask] = self.pacman_start
+        self.direction[mask] = 0
+        self.requested[mask] = 0
+        self.pacman_progress[mask] = 0.0
+        self.ghosts[mask] = self.ghost_start
+        self.ghost_progress[mask] = 0.0
+        self.dfs_length[mask] = 0
+        self.dfs_next[mask] = 0
+        self.dfs_target[mask] = -1
+        self.player_moved[mask] = False
+
+    def action_sample(self):
+        return self.rng.integers(0, NUM_ACTIONS, size=self.n, dtype=np.int8)
+
+    def _is_open(self, cells, directions):
+        return (directions > 0) & (((self.pacman_open[cells] >> np.maximum(directions - 1, 0)) & 1) == 1)
+
+    def _move_pacman(self, actions, running):
+        # Như PacMan.move: giữ hướng yêu cầu, đổi hướng nếu đi được, nếu không thì giữ hoặc dừng
+        self.requested = np.where(running & (actions > 0), actions, self.requested).astype(np.int8)
+        pacman = self.pacman
+        requested_ok = self._is_open(pacman, self.requested)
+        current_ok = self._is_open(pacman, self.direction)
+        self.direction = np.where(running, np.where(requested_ok, self.requested,
+                                                    np.where(current_ok, self.direction, 0)),
+                                  self.direction).astype(np.int8)
+        self.pacman_progress[running] += PACMAN_SPEED
+        arrived = running & (self.pacman_progress >= 1.0)
+        self.pacman_progress[arrived] = 0.0
+        # Hướng đã được kiểm tra ở trên nên luôn đi được; hướng 0 "đến" lại ô cũ và vẫn ăn chấm ở đó
+        games = np.flatnonzero(arrived)
+        pacman[games] += self.delta[self.direction[games]]
+
+        # Ăn chấm ở ô mới
+        cells = self.pacman[games]
+        values = self.board[games, cells]
+        eaten = (values == 1) | (values == 2)
+        self.score[games] += np.where(values == 1, 10, np.where(values == 2, 50, 0))
+        self.dots[games[eaten]] -= 1
+        self.board[games[eaten], cells[eaten]] = 0
+
+    def _plan_dfs(self, game, slot, ghost_cell, target):
+        key = (ghost_cell, target)
+        path = self._dfs_memo.get(key)
+        if path is None:
+            maze = self.maze
+            self._dfs_ghost.position = maze.cell_pos(ghost_cell)
+            path = tuple(maze.cell_id(x, y) for x, y in
+                         self._dfs_ghost.dfs(maze, maze.cell_pos(target))["path"])
+            self._dfs_memo[key] = path
+        self.dfs_path[game, slot, :len(path)] = path
+        self.dfs_length[game, slot] = len(path)
+        self.dfs_next[game, slot] = 0
+        self.dfs_target[game, slot] = target
+
+    def _move_ghosts(self, active):
+        pacman = self.pacman
+        # Chính sách bảng next-hop (mọi thuật toán đường ngắn nhất)
+        if len(self.table_slots):
+            slots = self.table_slots
+            ghosts = self.ghosts[:, slots]
+            hop_index = self.next_hop[self.index_of_cell[ghosts], self.index_of_cell[pacman][:, None]]
+            has_path = active[:, None] & (ghosts != pacman[:, None]) & (hop_index >= 0)
+            progress = self.ghost_progress[:, slots]
+            progress = np.where(has_path, progress + GHOST_SPEED, progress)
+            arrived = has_path & (progress >= 1.0)
+            progress[arrived] = 0.0
+            ghosts = np.where(arrived, self.cell_of_index[np.maximum(hop_index, 0)], ghosts)
+            self.ghosts[:, slots] = ghosts
+            self.ghost_progress[:, slots] = progress
+
+        # DFS: lập lại đường khi Pac-Man đổi ô hoặc đường đã đi hết, rồi đi theo bộ đệm
+        for slot, ghost_slot in enumerate(self.dfs_slots):
+            ghosts = self.ghosts[:, ghost_slot]
+            stale = active & ((self.dfs_target[:, slot] != pacman)
+                              | (self.dfs_next[:, slot] >= self.dfs_length[:, slot]))
+            for game in np.flatnonzero(stale):
+                self._plan_dfs(game, slot, int(ghosts[game]), int(pacman[game]))
+            has_path = active & (self.dfs_next[:, slot] < self.dfs_length[:, slot])
+            progress = self.ghost_progress[:, ghost_slot]
+            progress[has_path] += GHOST_SPEED
+            arrived = has_path & (progress >= 1.0)
+            progress[arrived] = 0.0
+            games = np.flatnonzero(arrived)
+            ghosts[games] = self.dfs_path[games, slot, self.dfs_next[games, slot]]
+            self.dfs_next[games, slot] += 1
+
+    def step(self, actions):
+        """
+        Advance every unfinished game by one tick.
+
+        Args:
+            actions (array-like): (N,) ints in [0, NUM_ACTIONS); 0 keeps the
+                current input, k moves along DIRECTIONS[k - 1].
+
+        Returns:
+            tuple: (rewards, dones) as (N,) arrays; a reward is the score
+            gained this tick. With auto_reset, finished games are restarted
+            before returning and dones marks them.
+        """
+        actions = np.asarray(actions, dtype=np.int8)
+        running = ~(self.game_over | self.game_won)
+        score_before = self.score.copy()
+        self.ticks[running] += 1
+
+        self.player_moved |= running & (actions > 0)
+        self._move_pacman(actions, running)
+        self._move_ghosts(running & self.player_moved)
+
+        caught = running & (self.ghosts == self.pacman[:, None]).any(axis=1)
+        self.lives[caught] -= 1
+        self.game_over |= caught & (self.lives <= 0)
+        self._reset_positions(caught & (self.lives > 0))
+        self.game_won |= running & (self.dots == 0)
+
+        rewards = self.score - score_before
+        dones = running & (self.game_over | self.game_won)
+        if self.auto_reset and dones.any():
+            self.reset(dones)
+        return rewards, dones
+
+    def observe(self):
+        """
+        Snapshot of the batch state.
+
+        Returns:
+            dict: "pacman" (N, 2) and "ghosts" (N, G, 2) as (x, y), "board"
+            (N, height, width) of remaining dots, "lives", "score".
+        """
+        width = self.maze.width
+        return {
+            "pacman": np.stack([self.pacman % width, self.pacman // width], axis=-1),
+            "ghosts": np.stack([self.ghosts % width, self.ghosts // width], axis=-1),
+            "board": self.board.reshape(self.n, self.maze.height, width).copy(),
+            "lives": self.lives.copy(),
+            "score": self.score.copy(),
+        }